@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Benchmark the cold-start latency of every d3b subcommand: a new interpreter
+parses the command line and imports the module of the subcommand handler,
+without running it. -eager imports every subcommand module first, like the
+CLI did before handlers were resolved lazily.
+
+    python benchmarks/bench_cli_startup.py -repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+SUBCOMMANDS = [
+    ["version"],
+    ["validation", "manifest", "-manifest_file", "manifest.csv"],
+    ["validation", "bam", "sample.bam"],
+    ["validation", "bam_manifest", "-manifest_file", "manifest.csv", "-bam_dir", "bams"],
+    ["validation", "url", "https://example.org"],
+    ["dewrangle", "hash", "-study", "study", "-bucket", "bucket"],
+    ["dewrangle", "list_jobs", "-study", "study", "-bucket", "bucket"],
+    ["dewrangle", "download", "-jobid", "job", "-outfile", "out.csv"],
+    ["jira", "create_ticket", "-jira_url", "url", "-project", "p", "-issue_type", "Task", "-fields", "{}"],
+]
+
+MODULES = [
+    "d3b_dff_cli.modules.validation.check_manifest",
+    "d3b_dff_cli.modules.validation.check_readgroup",
+    "d3b_dff_cli.modules.validation.check_bam_manifest",
+    "d3b_dff_cli.modules.validation.check_url",
+    "d3b_dff_cli.modules.dewrangle.volume",
+    "d3b_dff_cli.modules.dewrangle.list_jobs",
+    "d3b_dff_cli.modules.dewrangle.download_job",
+    "d3b_dff_cli.modules.jira.create_ticket",
+]
+
+STARTUP = """
+import importlib, sys
+{eager}
+from d3b_dff_cli.cli import create_parser
+args = create_parser().parse_args(sys.argv[1:])
+module = getattr(args.func, "module", None)
+if module:
+    importlib.import_module(module, "d3b_dff_cli")
+"""
+
+
+def startup_seconds(argv, eager, repeat):
+    """Wall time of every run of a new interpreter resolving the subcommand handler."""
+    code = STARTUP.format(eager="\n".join(f"import {module}" for module in MODULES) if eager else "")
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code] + argv, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(args):
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    baseline = statistics.median(times)
+    print(f"{'python -c pass':<32} {baseline * 1000:8.0f} ms")
+
+    for argv in SUBCOMMANDS:
+        name = " ".join(argv[:2]) if len(argv) > 1 and not argv[1].startswith("-") else argv[0]
+        lazy = statistics.median(startup_seconds(argv, False, args.repeat))
+        line = f"{name:<32} {lazy * 1000:8.0f} ms"
+        if args.eager:
+            eager = statistics.median(startup_seconds(argv, True, args.repeat))
+            line += f"   eager {eager * 1000:6.0f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of d3b subcommands.")
+    parser.add_argument("-repeat", type=int, default=5, help="Runs per subcommand, the median is reported. Default: 5")
+    parser.add_argument("-eager", action="store_true", help="Also time importing every subcommand module up front.")
+    args = parser.parse_args()
+    main(args)
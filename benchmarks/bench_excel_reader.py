@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Benchmark reading an .xlsx manifest with pd.read_excel versus the streaming
+reader, loading the whole sheet or in chunks. Every mode runs in a new process
+so its peak RSS is measured on its own.
+
+    python benchmarks/bench_excel_reader.py -rows 100000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+import pandas as pd
+from d3b_dff_cli.modules.validation.excel_reader import iter_excel_manifest, read_excel_manifest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+example_manifest = os.path.join(root_dir, "data", "example_manifest.csv")
+
+
+def build_workbook(path, rows):
+    """Write an .xlsx manifest of rows rows, repeating the example manifest."""
+    df = pd.read_csv(example_manifest)
+    df = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).iloc[:rows]
+    with pd.ExcelWriter(path) as writer:
+        df.to_excel(writer, sheet_name="Genomics_Manifest", index=False)
+        pd.DataFrame({"notes": ["not a manifest"]}).to_excel(writer, sheet_name="README", index=False)
+
+
+def read_pandas(path, chunksize):
+    return len(pd.read_excel(path, sheet_name="Genomics_Manifest"))
+
+
+def read_streaming(path, chunksize):
+    return len(read_excel_manifest(path))
+
+
+def read_chunks(path, chunksize):
+    return sum(len(chunk) for chunk in iter_excel_manifest(path, chunksize))
+
+
+def run(mode, path, chunksize):
+    start = time.perf_counter()
+    rows = mode(path, chunksize)
+    seconds = time.perf_counter() - start
+    return rows, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args):
+    path = args.manifest_file
+    if path is None:
+        path = os.path.join(args.output_dir, f"bench_manifest_{args.rows}.xlsx")
+        if not os.path.exists(path):
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                pool.apply(build_workbook, (path, args.rows))
+
+    # The peak RSS of a process is inherited by its children, so every mode
+    # runs before this process loads the manifest itself
+    context = multiprocessing.get_context("spawn")
+    for name, mode in [("pd.read_excel", read_pandas), ("streaming", read_streaming), (f"chunks of {args.chunksize}", read_chunks)]:
+        with context.Pool(1) as pool:
+            rows, seconds, peak_rss = pool.apply(run, (mode, path, args.chunksize))
+        print(f"{name}: {rows} rows in {seconds:.1f} s, peak RSS {peak_rss:.0f} MB")
+
+    reference = pd.read_excel(path, sheet_name="Genomics_Manifest")
+    if not read_excel_manifest(path).equals(reference):
+        raise RuntimeError("Streaming reader results differ from pd.read_excel")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming Excel manifest reader.")
+    parser.add_argument("-manifest_file", default=None, help="Excel manifest to read. Default: generated from the example manifest")
+    parser.add_argument("-rows", type=int, default=100000, help="Number of rows of the generated manifest. Default: 100000")
+    parser.add_argument("-chunksize", type=int, default=10000, help="Rows per chunk in chunked mode. Default: 10000")
+    parser.add_argument("-output_dir", default=".", help="Directory of the generated manifest. Default: .")
+    args = parser.parse_args()
+    main(args)
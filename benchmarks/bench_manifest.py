@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Benchmark the stages of `d3b validation manifest` on synthetic manifests of
+several sizes and formats, and write the results to JSON.
+
+Every (rows, format) case runs in a new process, which times load_data,
+the schema loading, the rule type classification, validate_data and
+the report printing separately and records the peak RSS after each stage.
+Generated manifests are kept in -data_dir and reused by later runs.
+
+    python benchmarks/bench_manifest.py -rows 10000 100000 -formats csv xlsx
+    python benchmarks/bench_manifest.py -compare benchmarks/results/manifest-0.1.0.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import pandas as pd
+from d3b_dff_cli.version import __version__
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_manifest import FORMATS, write_manifest  # noqa: E402
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+results_dir = os.path.join(root_dir, "benchmarks", "results")
+
+STAGES = ["load_data", "load_schema", "classify_rule_types", "validate_data", "print_report"]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(manifest_file, engine):
+    """
+    Run every validation stage on manifest_file and return their timings.
+    """
+    from d3b_dff_cli.modules.validation import check_manifest
+
+    stages = {}
+
+    def timed(stage, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        stages[stage] = {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+        return result
+
+    def load_schema():
+        with open(check_manifest.validation_schema, "r") as f:
+            return json.load(f)
+
+    schema_json = timed("load_schema", load_schema)
+    compiled = check_manifest.compile_validators(schema_json, engine)
+    df = timed("load_data", check_manifest.load_data, manifest_file, schema_json)
+    timed("classify_rule_types", check_manifest.classify_rule_types, df)
+    valid, errors = timed("validate_data", check_manifest.validate_data, df, schema_json, engine, compiled)
+
+    def print_report():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = check_manifest.ValidationReport()
+            report.add(errors)
+            check_manifest.print_status(valid, report.warnings_only)
+            check_manifest.print_errors(errors)
+
+    timed("print_report", print_report)
+    return {"stages": stages, "invalid_rows": len(errors), "peak_rss_mb": peak_rss_mb()}
+
+
+def run_isolated(function, *args):
+    """
+    Call function in a new process so its peak RSS is measured on its own.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def compare(results, baseline_file):
+    """
+    Print the time ratio of every stage against a previous results file.
+    """
+    with open(baseline_file, "r") as f:
+        baseline = {(case["rows"], case["format"]): case for case in json.load(f)["cases"]}
+    print(f"\nCompared to {baseline_file}:")
+    for case in results["cases"]:
+        previous = baseline.get((case["rows"], case["format"]))
+        if previous is None:
+            continue
+        ratios = [
+            f"{stage} {case['stages'][stage]['seconds'] / previous['stages'][stage]['seconds']:.2f}x"
+            for stage in STAGES
+            if previous["stages"].get(stage, {}).get("seconds")
+        ]
+        print(f"  {case['rows']} rows {case['format']}: {', '.join(ratios)}")
+
+
+def main(args):
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {
+        "version": __version__,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+        "engine": args.engine,
+        "error_rate": args.error_rate,
+        "cases": [],
+    }
+
+    for rows in args.rows:
+        for file_format in args.formats:
+            manifest_file = os.path.join(args.data_dir, f"manifest_{rows}_{args.error_rate}.{file_format}")
+            if not os.path.exists(manifest_file):
+                run_isolated(write_manifest, manifest_file, rows, args.error_rate)
+            case = run_isolated(run_case, manifest_file, args.engine)
+            case.update({"rows": rows, "format": file_format})
+            results["cases"].append(case)
+
+            timings = ", ".join(f"{stage} {case['stages'][stage]['seconds']:.2f}s" for stage in STAGES)
+            print(f"{rows} rows {file_format}: {timings}, peak RSS {case['peak_rss_mb']:.0f} MB")
+
+    output = args.output or os.path.join(results_dir, f"manifest-{__version__}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stages of manifest validation.")
+    parser.add_argument("-rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="Manifest sizes. Default: 10000 100000 1000000")
+    parser.add_argument("-formats", nargs="+", choices=FORMATS, default=FORMATS, help="Manifest formats. Default: csv tsv xlsx")
+    parser.add_argument("-error_rate", type=float, default=0.05, help="Fraction of rows with one error. Default: 0.05")
+    parser.add_argument("-engine", choices=["columnar", "cerberus"], default="columnar", help="Validation engine. Default: columnar")
+    parser.add_argument("-data_dir", default=os.path.join(root_dir, "benchmarks", "data"), help="Directory of the generated manifests. Default: benchmarks/data")
+    parser.add_argument("-output", default=None, help="Results file. Default: benchmarks/results/manifest-<version>.json")
+    parser.add_argument("-compare", default=None, help="Previous results file to compare the stage timings with.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark the per-file latency of `d3b validation bam` on synthetic BAM and
+CRAM files: check_rg, which decompresses only the header blocks and falls back
+to the RG tag of the first reads, versus the previous check, which parsed the
+header with pysam and formatted the first 5k reads as SAM text.
+
+Files have @RG in the header, or only in the reads, and a small or large
+header (-sq @SQ lines). Generated files are kept in -data_dir and reused.
+
+    python benchmarks/bench_readgroup.py -sq 25 3000 100000 -repeat 20
+"""
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import time
+import pysam
+from d3b_dff_cli.modules.validation.check_readgroup import check_rg
+
+READS = 6000
+REFERENCE_LENGTH = 100000
+
+
+def previous_check_rg(file_path):
+    """The check before the header fast path, for comparison."""
+    with pysam.AlignmentFile(file_path, "rb") as bam:
+        if "RG" not in bam.header.to_dict():
+            return any("RG:" in line.to_string() for line in bam.head(5000))
+    return True
+
+
+def write_reference(data_dir):
+    path = os.path.join(data_dir, "reference.fa")
+    rnd = random.Random(0)
+    sequence = "".join(rnd.choice("ACGT") for _ in range(REFERENCE_LENGTH))
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            f.write(">chr1\n" + "\n".join(sequence[i:i + 60] for i in range(0, len(sequence), 60)) + "\n")
+        pysam.faidx(path)
+    return path, sequence
+
+
+def write_alignments(path, mode, sq, header_rg, reference, sequence):
+    """
+    Write READS reads of chr1 with an RG tag, with sq @SQ lines in the header
+    and @RG in the header when header_rg is True.
+    """
+    header = {
+        "HD": {"VN": "1.6", "SO": "coordinate"},
+        "SQ": [{"SN": "chr1", "LN": REFERENCE_LENGTH, "M5": hashlib.md5(sequence.encode()).hexdigest()}]
+        + [{"SN": f"contig{i}", "LN": 1000} for i in range(sq - 1)],
+    }
+    if header_rg:
+        header["RG"] = [{"ID": "rg1", "SM": "sample", "PL": "ILLUMINA", "PU": "FC1.1", "LB": "lib1"}]
+    qualities = pysam.qualitystring_to_array("I" * 100)
+    with pysam.AlignmentFile(path, mode, header=header, reference_filename=reference) as f:
+        for i in range(READS):
+            start = i * 10 % (REFERENCE_LENGTH - 100)
+            read = pysam.AlignedSegment(f.header)
+            read.query_name = f"read{i}"
+            read.query_sequence = sequence[start:start + 100]
+            read.flag = 0
+            read.reference_id = 0
+            read.reference_start = start
+            read.mapping_quality = 60
+            read.cigarstring = "100M"
+            read.query_qualities = qualities
+            read.set_tag("RG", "rg1")
+            f.write(read)
+
+
+def median_ms(function, file_path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(file_path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(args):
+    os.makedirs(args.data_dir, exist_ok=True)
+    reference, sequence = write_reference(args.data_dir)
+    print(f"{'file':<36} {'size':>9} {'check_rg':>10} {'previous':>10}")
+    for sq in args.sq:
+        for file_format, mode in (("bam", "wb"), ("cram", "wc")):
+            for header_rg in (True, False):
+                name = f"sq{sq}-{'header' if header_rg else 'reads'}-rg.{file_format}"
+                path = os.path.join(args.data_dir, name)
+                if not os.path.exists(path):
+                    write_alignments(path, mode, sq, header_rg, reference, sequence)
+                if file_format == "cram" and not header_rg:
+                    # Reading CRAM alignments needs the reference
+                    check = lambda file_path: check_rg(file_path, reference=reference)
+                else:
+                    check = check_rg
+                line = f"{name:<36} {os.path.getsize(path) / 1e6:7.2f}MB {median_ms(check, path, args.repeat):8.2f}ms"
+                if file_format == "bam":
+                    line += f" {median_ms(previous_check_rg, path, args.repeat):8.2f}ms"
+                print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the per-file latency of BAM/CRAM @RG checks.")
+    parser.add_argument("-sq", type=int, nargs="+", default=[25, 3000, 100000], help="@SQ lines per header. Default: 25 3000 100000")
+    parser.add_argument("-repeat", type=int, default=20, help="Checks per file, the median is reported. Default: 20")
+    parser.add_argument("-data_dir", default=os.path.join("benchmarks", "data", "readgroup"), help="Directory of the generated files.")
+    args = parser.parse_args()
+    main(args)
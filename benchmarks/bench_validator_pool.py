@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Benchmark the per-row cost of the Cerberus validation path, building a new
+CustomValidator for every row versus reusing one validator per rule type.
+
+    python benchmarks/bench_validator_pool.py -rows 2000
+"""
+import argparse
+import json
+import os
+import time
+import pandas as pd
+from d3b_dff_cli.modules.validation.cerberus_custom_checks import CustomValidator
+from d3b_dff_cli.modules.validation.check_manifest import (
+    build_validator_pool,
+    load_data,
+    validation_schema,
+)
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+example_manifest = os.path.join(root_dir, "data", "example_manifest.csv")
+
+
+def row_documents(df, schema):
+    """Yield the filtered row documents validated by validate_data."""
+    for _, row in df.iterrows():
+        yield {k: v for k, v in row.to_dict().items() if k in schema}
+
+
+def per_row_validators(documents, schema, custom_rules):
+    """Previous behaviour: one new, normalizing validator per row."""
+    return [
+        CustomValidator(schema, custom_rules).validate(doc, normalize=True, update=False)
+        for doc in documents
+    ]
+
+
+def pooled_validator(documents, validator):
+    """Reuse a single validator for every row."""
+    return [validator.validate(doc) for doc in documents]
+
+
+def main(args):
+    with open(validation_schema, "r") as f:
+        schema_json = json.load(f)
+    schema = schema_json["DNAseq_rules"]
+    custom_rules = schema_json.get("custom_rules", {})
+
+    df = load_data(args.manifest_file)
+    df = pd.concat([df] * (args.rows // len(df) + 1), ignore_index=True).iloc[: args.rows]
+    documents = list(row_documents(df, schema))
+
+    start = time.perf_counter()
+    before = per_row_validators(documents, schema, custom_rules)
+    before_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validator = build_validator_pool(schema_json)["DNAseq_rules"]
+    after = pooled_validator(documents, validator)
+    after_seconds = time.perf_counter() - start
+
+    if before != after:
+        raise RuntimeError("Pooled validator results differ from per-row validators")
+
+    print(f"rows: {len(documents)}")
+    print(f"per-row validator: {before_seconds / len(documents) * 1e6:.1f} us/row")
+    print(f"pooled validator:  {after_seconds / len(documents) * 1e6:.1f} us/row")
+    print(f"speedup: {before_seconds / after_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Cerberus validator pool.")
+    parser.add_argument("-manifest_file", default=example_manifest, help="Manifest used as row template.")
+    parser.add_argument("-rows", type=int, default=2000, help="Number of rows to validate. Default: 2000")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Generate synthetic manifests for benchmarking manifest validation.
+
+Rows are built from the columns of data/example_manifest.csv and cycle through
+every rule type of the validation schema. A configurable fraction of rows gets
+one error (an unallowed value, a wrong file extension, a small file size or an
+unsupported experiment_strategy) without changing the inferred column types.
+
+    python benchmarks/generate_manifest.py -rows 100000 -error_rate 0.05 -output manifest.xlsx
+"""
+import argparse
+import os
+import random
+import openpyxl
+import pandas as pd
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+example_manifest = os.path.join(root_dir, "data", "example_manifest.csv")
+
+FORMATS = ["csv", "tsv", "xlsx"]
+
+# Values valid for every rule type, so columns that only some rule types use
+# keep a single inferred type
+COMMON_VALUES = {
+    "tissue_type": "Tumor",
+    "file_hash_type": "MD5",
+    "sequencing_center": "Broad",
+    "instrument_model": "Illumina NovaSeq 6000",
+    "library_selection": "Hybrid Selection",
+    "library_strand": "Not Applicable",
+    "target_capture_kit_name": "SureSelect",
+    "target_capture_kit_link": "https://example.org/kit",
+    "is_paired_end": True,
+    "read_pair_number": "R1",
+    "flow_cell_barcode": "H0164ALXX140820",
+    "lane_number": 1,
+    "adapter_sequencing": "AGATCGGAAGAGC",
+    "total_reads": 1000000,
+    "mean_coverage": "30X",
+    "reference_genome": "GRCh38",
+    "organism": "Homo sapiens",
+    "cell_entity": "Single Cell",
+    "end_bias": "3'-end",
+    "library_construction": "10x Chromium 3' v3",
+    "UMI_barcode_read": "read1",
+    "UMI_barcode_offset": 16,
+    "UMI_barcode_size": 12,
+    "cell_barcode_read": "read1",
+    "cell_barcode_offset": 0,
+    "cell_barcode_size": 16,
+    "cDNA_read": "read2",
+    "cDNA_read_offset": 0,
+    "sequencing_mode": "CCS",
+}
+
+# (platform, experiment_strategy, file_format, extension) of every rule type
+RULE_TYPE_ROWS = [
+    ("Illumina", "WGS", "CRAM", ".cram"),
+    ("Illumina", "WXS", "BAM", ".bam"),
+    ("Illumina", "Panel", "FASTQ", ".fq.gz"),
+    ("Illumina", "RNA-Seq", "FASTQ", ".fq.gz"),
+    ("Illumina", "miRNA-Seq", "BAM", ".bam"),
+    ("Illumina", "scRNA-Seq", "FASTQ", ".fq.gz"),
+    ("PacBio", "WGS", "BAM", ".bam"),
+    ("Illumina Infinium HumanMethylationEPIC", "Methylation", "IDAT", ".idat"),
+]
+
+ERRORS = [
+    ("file_format", "BAMX"),
+    ("file_hash_type", "CRC32"),
+    ("tissue_type", "Tumour"),
+    ("file_name", ".txt"),
+    ("file_size", 1000),
+    ("experiment_strategy", "Hi-C"),
+]
+
+
+def generate_rows(rows, error_rate=0.0, seed=0):
+    """
+    Yield the header and then the values of every row of a synthetic manifest.
+    """
+    columns = list(pd.read_csv(example_manifest, nrows=0).columns)
+    columns += [column for column in COMMON_VALUES if column not in columns]
+    yield columns
+
+    rnd = random.Random(seed)
+    for index in range(rows):
+        platform, strategy, file_format, extension = RULE_TYPE_ROWS[index % len(RULE_TYPE_ROWS)]
+        row = dict(COMMON_VALUES)
+        row.update({
+            "sample_id": f"sample{index // 4}",
+            "aliquot_id": 100000 + index // 2,
+            "file_name": f"sample{index // 4}_{index}{extension}",
+            "file_format": file_format,
+            "file_size": rnd.randint(2000000000, 90000000000),
+            "file_hash_value": f"{rnd.getrandbits(128):032x}",
+            "platform": platform,
+            "experiment_strategy": strategy,
+            # adapter_sequencing is only checked for untrimmed FASTQ files
+            "is_adapter_trimmed": file_format != "FASTQ",
+        })
+        if rnd.random() < error_rate:
+            field, value = rnd.choice(ERRORS)
+            row[field] = row[field].rsplit(".", 1)[0] + value if field == "file_name" else value
+        yield [row.get(column) for column in columns]
+
+
+def write_manifest(path, rows, error_rate=0.0, seed=0):
+    """
+    Write a synthetic manifest as CSV, TSV or XLSX, depending on the extension of path.
+    """
+    file_format = path.split(".")[-1].lower()
+    generated = generate_rows(rows, error_rate, seed)
+    if file_format == "xlsx":
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Genomics_Manifest")
+        for row in generated:
+            sheet.append(row)
+        workbook.save(path)
+    elif file_format in ["csv", "tsv"]:
+        columns = next(generated)
+        df = pd.DataFrame(generated, columns=columns)
+        df.to_csv(path, index=False, sep="\t" if file_format == "tsv" else ",")
+    else:
+        raise ValueError(f"Unsupported format {file_format}, use one of {', '.join(FORMATS)}.")
+
+
+def main(args):
+    write_manifest(args.output, args.rows, args.error_rate, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic manifest for benchmarks.")
+    parser.add_argument("-rows", type=int, default=100000, help="Number of rows. Default: 100000")
+    parser.add_argument("-error_rate", type=float, default=0.0, help="Fraction of rows with one error. Default: 0")
+    parser.add_argument("-seed", type=int, default=0, help="Random seed. Default: 0")
+    parser.add_argument("-output", required=True, help="Output manifest, .csv, .tsv or .xlsx.")
+    args = parser.parse_args()
+    main(args)
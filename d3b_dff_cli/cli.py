@@ -1,14 +1,45 @@
 import argparse
+import importlib
 import sys
 from .version import __version__
-from .modules.validation.check_manifest import main as check_manifest
-from .modules.validation.check_readgroup import main as check_readgroup
-from .modules.validation.check_url import main as check_url
-from .modules.dewrangle.volume import main as hash_volume
-from .modules.dewrangle.volume import run_list as list_volume
-from .modules.dewrangle.list_jobs import main as list_jobs
-from .modules.dewrangle.download_job import main as download_dewrangle_job
-from .modules.jira.create_ticket import main as create_ticket
+
+
+def lazy_handler(module, function="main"):
+    """
+    Create a subcommand handler that imports its module only when the subcommand runs,
+    so every command only pays for the imports it needs.
+    Input:
+        - module: module path relative to this package, e.g. ".modules.validation.check_url"
+        - function: name of the handler in that module
+    Output:
+        - function taking the parsed arguments
+    """
+    def handler(args):
+        return getattr(importlib.import_module(module, __package__), function)(args)
+
+    handler.module = module
+    return handler
+
+
+def positive_int(value):
+    """
+    Argument type of options that take a number above 0.
+    """
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value}")
+    return number
+
+
+check_manifest = lazy_handler(".modules.validation.check_manifest")
+check_readgroup = lazy_handler(".modules.validation.check_readgroup")
+check_bam_manifest = lazy_handler(".modules.validation.check_bam_manifest")
+check_url = lazy_handler(".modules.validation.check_url")
+hash_volume = lazy_handler(".modules.dewrangle.volume")
+list_volume = lazy_handler(".modules.dewrangle.volume", "run_list")
+list_jobs = lazy_handler(".modules.dewrangle.list_jobs")
+download_dewrangle_job = lazy_handler(".modules.dewrangle.download_job")
+create_ticket = lazy_handler(".modules.jira.create_ticket")
 
 
 def add_dewrangle_arguments(my_parser):
@@ -79,20 +110,187 @@ def create_parser():
     )
     manifest_parser.add_argument(
         "-manifest_file",
-        help="Manifest based on the d3b genomics manifest template.",
+        help="Manifest based on the d3b genomics manifest template (CSV, TSV, Excel, Parquet or Feather). Several manifests, directories of manifests or glob patterns are validated as a batch.",
+        nargs="+",
         required=True,
     )
+    manifest_parser.add_argument(
+        "-engine",
+        help="Optional, validation engine. 'cerberus' validates row by row and is kept as reference. Default: columnar",
+        choices=["columnar", "cerberus"],
+        default="columnar",
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-chunksize",
+        help="Optional, stream the manifest and validate it in chunks of this many rows, printing errors as they are found. Default: None",
+        type=positive_int,
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-csv_reader",
+        help="Optional, parser of CSV/TSV manifests. 'arrow' uses the multithreaded Arrow CSV reader (requires pyarrow), 'auto' uses it for files of 64 MB or more when pyarrow is installed. Streamed manifests (-chunksize) are parsed with pandas. Default: auto",
+        choices=["auto", "pandas", "arrow"],
+        default="auto",
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-workers",
+        help="Optional, number of worker processes validating manifest partitions, or the manifests of a batch, in parallel. Default: 1",
+        type=positive_int,
+        default=1,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-no_cache",
+        help="Optional, don't read or write the on-disk compiled schema cache. Default: false",
+        required=False,
+        default=False,
+        action="store_true",
+    )
+    manifest_parser.add_argument(
+        "-incremental",
+        help="Optional, state file storing row hashes and results; only rows that are new or changed since the previous run with the same file are validated. Default: None",
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-report",
+        help="Optional, write a machine-readable report aggregating identical errors with their count, row ranges and example rows. Default: None",
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-report_dir",
+        help="Optional, for a batch of manifests, directory receiving one report per manifest, named after it, and a combined summary.json. Default: None",
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-report_format",
+        help="Optional, report format. 'ndjson' streams row errors while validating and ends with the summary. Default: from the -report file extension",
+        choices=["json", "ndjson", "parquet"],
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-summary",
+        help="Optional, print one line per distinct error with its row count and row ranges instead of every row error. Default: false",
+        required=False,
+        default=False,
+        action="store_true",
+    )
+    manifest_parser.add_argument(
+        "-fail_fast",
+        help="Optional, stop validating at the first row with errors (rows with only warnings don't count); the report ends at that row. Default: false",
+        required=False,
+        default=False,
+        action="store_true",
+    )
+    manifest_parser.add_argument(
+        "-max_errors",
+        help="Optional, stop validating once this many rows have errors (above 0); parallel and streamed validation is cancelled and the report ends at the last of them. Default: None",
+        type=positive_int,
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-cross_row",
+        help="Optional, also run cross-row checks: duplicate file names and file hashes, and paired-end FASTQ mates that are missing or disagree on sample, flow cell or lane. Default: false",
+        required=False,
+        default=False,
+        action="store_true",
+    )
+    manifest_parser.add_argument(
+        "-rules",
+        help="Optional, condition/consequence rules file (such as data/validation_rules.json) to evaluate instead of the validation schema. The rules are evaluated in -workers processes; -engine and -incremental are not supported with it. Default: None",
+        default=None,
+        required=False,
+    )
+    manifest_parser.add_argument(
+        "-rule_set",
+        help="Optional, rule list of the -rules file. Default: transfer_validation_rules",
+        default="transfer_validation_rules",
+        required=False,
+    )
     manifest_parser.set_defaults(func=check_manifest)
 
     ## validation read-group subcommand
     parser_bam = validation_subparsers.add_parser(
-        "bam", help="Validator for BAM file @RG based on Samtools."
+        "bam", help="Validator for BAM/CRAM file @RG based on Samtools."
+    )
+    parser_bam.add_argument(
+        "bam_files", nargs="+",
+        help="One or more BAM/CRAM files, or http(s):// or s3:// URLs, to validate #RG. "
+        "s3:// URLs are signed with AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY, or with the profile, "
+        "~/.aws/credentials or instance role credentials when botocore is installed; "
+        "without credentials, read public objects from their https:// URL."
     )
     parser_bam.add_argument(
-        "bam_files", nargs="+", help="One or more BAM files to validate #RG"
+        "-workers",
+        help="Optional, number of worker processes (threads for URLs) checking files in parallel; results are printed in input order. Default: 1",
+        type=positive_int,
+        default=1,
+        required=False,
+    )
+    parser_bam.add_argument(
+        "-threads",
+        help="Optional, BGZF decompression threads used by pysam for each file. Default: 1",
+        type=positive_int,
+        default=1,
+        required=False,
+    )
+    parser_bam.add_argument(
+        "-reference",
+        help="Optional, reference FASTA used to read the alignments of CRAM files whose header has no @RG. CRAM headers are read without it. Default: None",
+        default=None,
+        required=False,
+    )
+    parser_bam.add_argument(
+        "-deep",
+        help="Optional, audit every read instead of the first 5k: count reads per RG ID and report reads without an RG tag or with an RG ID not declared in the header.",
+        action="store_true",
+        required=False,
+    )
+    parser_bam.add_argument(
+        "-stride",
+        help="Optional, with -deep, audit every N-th read only, for a faster sampled check. Default: 1",
+        type=positive_int,
+        default=1,
+        required=False,
     )
     parser_bam.set_defaults(func=check_readgroup)
 
+    ## validation bam_manifest subcommand
+    parser_bam_manifest = validation_subparsers.add_parser(
+        "bam_manifest", help="Cross-check the @RG lines of BAM/CRAM files with their manifest rows."
+    )
+    parser_bam_manifest.add_argument(
+        "-manifest_file",
+        help="Manifest based on the d3b genomics manifest template (CSV, TSV, Excel, Parquet or Feather). Its BAM/CRAM rows are checked.",
+        required=True,
+    )
+    parser_bam_manifest.add_argument(
+        "-bam_dir",
+        help="Root directory of the BAM/CRAM files; manifest file names are looked up in all its subdirectories.",
+        required=True,
+    )
+    parser_bam_manifest.add_argument(
+        "-workers",
+        help="Optional, number of worker processes reading BAM/CRAM headers in parallel. Default: 1",
+        type=positive_int,
+        default=1,
+        required=False,
+    )
+    parser_bam_manifest.add_argument(
+        "-report",
+        help="Optional, write the mismatches to this CSV file (TSV for a .tsv file), one line per mismatching field. Default: None",
+        default=None,
+        required=False,
+    )
+    parser_bam_manifest.set_defaults(func=check_bam_manifest)
+
     ## validation url subcommand
     parser_url = validation_subparsers.add_parser("url", help="Validator for URLs")
     parser_url.add_argument("urls", nargs="+", help="One or more URLs to validate")
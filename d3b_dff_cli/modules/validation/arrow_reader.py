@@ -0,0 +1,223 @@
+"""
+Arrow readers for Parquet, Feather and large CSV/TSV manifests.
+
+Parquet and Feather (Arrow IPC) files are memory-mapped and only the columns
+used by the rule sets are read. Large CSV/TSV files can be parsed with the
+multithreaded Arrow CSV reader, with the same projection. Tables are converted
+to DataFrames typed like pd.read_csv: columns without any value are float NaN,
+missing strings are "nan" (as load_data makes them), and dates and times are
+kept as strings.
+
+pyarrow is optional: it is only imported when one of these readers runs.
+"""
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+ARROW_EXTENSIONS = ["parquet", "feather", "arrow"]
+
+# CSV/TSV files from this size on are parsed with the Arrow CSV reader by default
+ARROW_CSV_MIN_BYTES = 64 * 1024 * 1024
+
+# Same missing values and booleans as pd.read_csv; by default Arrow doesn't
+# read "None" as missing and reads 1 and 0 as booleans
+NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+TRUE_VALUES = ["True", "TRUE", "true"]
+FALSE_VALUES = ["False", "FALSE", "false"]
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("Parquet, Feather and Arrow CSV manifests require pyarrow. Install it or use a CSV/TSV/Excel manifest.")
+    return pyarrow
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def use_arrow_csv(manifest_file, csv_reader="auto"):
+    """
+    Whether a CSV/TSV manifest is parsed with the Arrow CSV reader: always with
+    csv_reader "arrow", and with "auto" for large files when pyarrow is installed.
+    """
+    if csv_reader == "arrow":
+        return True
+    if csv_reader == "auto":
+        return os.path.getsize(manifest_file) >= ARROW_CSV_MIN_BYTES and has_pyarrow()
+    return False
+
+
+def projected_columns(names, usecols=None):
+    """
+    Columns of the file selected by usecols (a callable, like for pd.read_csv), in file order.
+    """
+    if usecols is None:
+        return list(names)
+    return [name for name in names if usecols(name)]
+
+
+def table_to_frame(table, start=0):
+    """
+    Convert an Arrow table to a DataFrame typed like pd.read_csv, with a
+    RangeIndex starting at start so row numbers stay global. Missing strings
+    are converted to "nan" in Arrow, as convert_strings would make them.
+    """
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    columns = []
+    for column in table.columns:
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        if column.null_count and column.null_count == len(column):
+            # Columns without any value are float NaN, as pd.read_csv reads them
+            column = pa.nulls(len(column), pa.float64())
+        elif column.null_count and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            column = pc.fill_null(column, "nan")
+        columns.append(column)
+    df = pa.table(columns, names=table.column_names).to_pandas(ignore_metadata=True, split_blocks=True)
+    df.index = pd.RangeIndex(start, start + len(df))
+    for name, column in df.items():
+        # Other nullable columns, such as booleans, hold None instead of NaN
+        if column.dtype == object and pa.types.is_boolean(table.schema.field(name).type) and column.isna().any():
+            df[name] = column.fillna(np.nan)
+    return df
+
+
+def open_arrow_file(manifest_file):
+    """
+    Open a memory-mapped Parquet or Feather file.
+    Returns the reader and the column names of the file.
+    """
+    pa = import_pyarrow()
+    if manifest_file.split('.')[-1].lower() == 'parquet':
+        import pyarrow.parquet as pq
+
+        reader = pq.ParquetFile(manifest_file, memory_map=True)
+        return reader, reader.schema_arrow.names
+    reader = pa.ipc.open_file(pa.memory_map(manifest_file, 'r'))
+    return reader, reader.schema.names
+
+
+def read_arrow_manifest(manifest_file, usecols=None):
+    """
+    Read the columns selected by usecols from a memory-mapped Parquet or Feather manifest.
+    """
+    reader, names = open_arrow_file(manifest_file)
+    columns = projected_columns(names, usecols)
+    if manifest_file.split('.')[-1].lower() == 'parquet':
+        table = reader.read(columns=columns)
+    else:
+        import pyarrow.feather as feather
+
+        # Only the projected columns are read from the memory-mapped file
+        table = feather.read_table(manifest_file, columns=columns, memory_map=True)
+    return table_to_frame(table)
+
+
+def is_arrow_table(data):
+    """
+    Whether data is an Arrow table or record batch, without importing pyarrow.
+    """
+    return type(data).__module__.startswith("pyarrow") and hasattr(data, "column_names")
+
+
+def read_arrow_table(table, usecols=None):
+    """
+    Convert the columns selected by usecols of an Arrow table or record batch held in memory.
+    """
+    pa = import_pyarrow()
+    if isinstance(table, pa.RecordBatch):
+        table = pa.Table.from_batches([table])
+    return table_to_frame(table.select(projected_columns(table.column_names, usecols)))
+
+
+def iter_ipc_batches(manifest_file, names, columns, chunksize):
+    """
+    Read the columns of a memory-mapped IPC file one record batch at a time, in
+    slices of at most chunksize rows. The other columns are not read.
+    """
+    pa = import_pyarrow()
+    selected = set(columns)
+    fields = [position for position, name in enumerate(names) if name in selected]
+    # An empty included_fields reads every column
+    options = pa.ipc.IpcReadOptions(included_fields=fields) if fields else None
+    reader = pa.ipc.open_file(pa.memory_map(manifest_file, 'r'), options=options)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i).select(columns)
+        for offset in range(0, batch.num_rows, chunksize):
+            yield batch.slice(offset, chunksize)
+
+
+def iter_arrow_manifest(manifest_file, chunksize, usecols=None):
+    """
+    Read a Parquet or Feather manifest in chunks of at most chunksize rows.
+    """
+    pa = import_pyarrow()
+    reader, names = open_arrow_file(manifest_file)
+    columns = projected_columns(names, usecols)
+    if manifest_file.split('.')[-1].lower() == 'parquet':
+        batches = reader.iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        batches = iter_ipc_batches(manifest_file, names, columns, chunksize)
+    start = 0
+    for batch in batches:
+        if batch.num_rows:
+            yield table_to_frame(pa.Table.from_batches([batch]), start)
+            start += batch.num_rows
+
+
+def read_header(manifest_file, delimiter):
+    with open(manifest_file, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def read_csv_arrow(manifest_file, delimiter=',', usecols=None):
+    """
+    Parse a CSV/TSV manifest with the multithreaded Arrow CSV reader. Only the
+    columns selected by usecols are converted.
+    """
+    pa = import_pyarrow()
+    import pyarrow.csv as pa_csv
+
+    columns = projected_columns(read_header(manifest_file, delimiter), usecols)
+    if not columns:
+        # Arrow reads every column when include_columns is empty; pd.read_csv reads none
+        return pd.DataFrame()
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter)
+
+    def read(column_types=None, include_columns=columns):
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=include_columns,
+            column_types=column_types,
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+            true_values=TRUE_VALUES,
+            false_values=FALSE_VALUES,
+        )
+        return pa_csv.read_csv(
+            manifest_file,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+
+    table = read()
+    # pd.read_csv keeps dates and times as strings: read them again as such
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        strings = read({name: pa.string() for name in temporal}, temporal)
+        for name in temporal:
+            table = table.set_column(table.schema.get_field_index(name), name, strings.column(name))
+    return table_to_frame(table)
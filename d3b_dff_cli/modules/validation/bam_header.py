@@ -0,0 +1,266 @@
+"""
+Read the header text of BAM and CRAM files without opening them with htslib.
+
+Only the bytes holding the header are read and decompressed: the first BGZF
+blocks of a BAM file, or the header container of a CRAM file. @RG lines are
+found without reading any alignment, and without the reference of a CRAM file.
+"""
+import bz2
+import lzma
+import struct
+import zlib
+from .remote_file import open_file
+
+BGZF_MAGIC = b"\x1f\x8b\x08\x04"
+BAM_MAGIC = b"BAM\x01"
+CRAM_MAGIC = b"CRAM"
+
+# Size in bytes of the values of BAM aux fields, by type
+AUX_SIZES = {b"A": 1, b"c": 1, b"C": 1, b"s": 2, b"S": 2, b"i": 4, b"I": 4, b"f": 4}
+
+# Size of the fixed part of a gzip member header, up to XLEN
+GZIP_HEADER_SIZE = 12
+
+# CRAM block compression methods handled with the standard library
+CRAM_DECOMPRESS = {
+    0: lambda data: data,
+    1: lambda data: zlib.decompress(data, 31),
+    2: bz2.decompress,
+    3: lzma.decompress,
+}
+
+
+def read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("truncated header")
+    return data
+
+
+def read_bgzf_block(f):
+    """
+    Read and decompress the next BGZF block of f. Returns None at the end of the file.
+    """
+    header = f.read(GZIP_HEADER_SIZE)
+    if not header:
+        return None
+    if len(header) != GZIP_HEADER_SIZE or header[:4] != BGZF_MAGIC:
+        raise ValueError("not a BGZF file")
+    xlen = struct.unpack("<H", header[10:12])[0]
+    extra = read_exact(f, xlen)
+    block_size = None
+    position = 0
+    while position + 4 <= xlen:
+        subfield, length = extra[position:position + 2], struct.unpack("<H", extra[position + 2:position + 4])[0]
+        if subfield == b"BC" and length == 2:
+            block_size = struct.unpack("<H", extra[position + 4:position + 6])[0] + 1
+        position += 4 + length
+    if block_size is None:
+        raise ValueError("BGZF block without its size")
+    # Deflated data, then CRC32 and ISIZE
+    data = read_exact(f, block_size - GZIP_HEADER_SIZE - xlen - 8)
+    read_exact(f, 8)
+    return zlib.decompress(data, -15)
+
+
+class BgzfReader:
+    """
+    Decompressed stream of a BAM file, reading its BGZF blocks one at a time.
+    """
+
+    def __init__(self, f, compressed=True):
+        self.f = f
+        self.compressed = compressed
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def next_block(self):
+        if self.compressed:
+            return read_bgzf_block(self.f)
+        return self.f.read(65536) or None
+
+    def fill(self, size):
+        """
+        Read blocks until size bytes are buffered. Returns False at the end of the file.
+        """
+        while len(self.buffer) - self.offset < size:
+            block = self.next_block()
+            if block is None:
+                return False
+            del self.buffer[:self.offset]
+            self.offset = 0
+            self.buffer += block
+        return True
+
+    def read(self, size):
+        if not self.fill(size):
+            raise ValueError("truncated BAM file")
+        data = bytes(self.buffer[self.offset:self.offset + size])
+        self.offset += size
+        return data
+
+    def at_end(self):
+        return not self.fill(1)
+
+
+def read_bam_header(stream):
+    """
+    Header text of a BAM file, from its decompressed stream.
+    """
+    if stream.read(4) != BAM_MAGIC:
+        raise ValueError("not a BAM file")
+    text_size = struct.unpack("<i", stream.read(4))[0]
+    return stream.read(text_size).decode("utf-8", "replace")
+
+
+def skip_references(stream):
+    """
+    Skip the reference sequences that follow the header text.
+    """
+    for _ in range(struct.unpack("<i", stream.read(4))[0]):
+        name_size = struct.unpack("<i", stream.read(4))[0]
+        stream.read(name_size + 4)
+
+
+def record_has_tag(record, tag):
+    """
+    Whether a BAM record, without its block_size, has the aux field tag.
+    """
+    name_size, cigar_ops, seq_size = record[8], struct.unpack("<H", record[12:14])[0], struct.unpack("<i", record[16:20])[0]
+    position = 32 + name_size + 4 * cigar_ops + (seq_size + 1) // 2 + seq_size
+    while position + 3 <= len(record):
+        if record[position:position + 2] == tag:
+            return True
+        value_type = record[position + 2:position + 3]
+        position += 3
+        if value_type in b"ZH":
+            position = record.index(b"\x00", position) + 1
+        elif value_type == b"B":
+            count = struct.unpack("<i", record[position + 1:position + 5])[0]
+            position += 5 + count * AUX_SIZES[record[position:position + 1]]
+        else:
+            position += AUX_SIZES[value_type]
+    return False
+
+
+def reads_have_rg(stream, reads=5000):
+    """
+    Whether one of the first reads of a BAM file has an RG tag. stream must be
+    positioned after the header text.
+    """
+    skip_references(stream)
+    for _ in range(reads):
+        if stream.at_end():
+            break
+        record = stream.read(struct.unpack("<i", stream.read(4))[0])
+        if record_has_tag(record, b"RG"):
+            return True
+    return False
+
+
+def read_itf8(f):
+    """
+    Read a CRAM ITF8 integer: the leading 1 bits of the first byte count the bytes that follow.
+    """
+    first = read_exact(f, 1)[0]
+    if first < 0x80:
+        return first
+    if first < 0xC0:
+        return ((first & 0x3F) << 8) | read_exact(f, 1)[0]
+    if first < 0xE0:
+        rest = read_exact(f, 2)
+        return ((first & 0x1F) << 16) | (rest[0] << 8) | rest[1]
+    if first < 0xF0:
+        rest = read_exact(f, 3)
+        return ((first & 0x0F) << 24) | (rest[0] << 16) | (rest[1] << 8) | rest[2]
+    rest = read_exact(f, 4)
+    return ((first & 0x0F) << 28) | (rest[0] << 20) | (rest[1] << 12) | (rest[2] << 4) | (rest[3] & 0x0F)
+
+
+def read_ltf8(f):
+    """
+    Read a CRAM LTF8 integer, the 64-bit version of ITF8.
+    """
+    first = read_exact(f, 1)[0]
+    extra = 0
+    while extra < 8 and first & (0x80 >> extra):
+        extra += 1
+    value = first & (0xFF >> (extra + 1)) if extra < 8 else 0
+    for byte in read_exact(f, extra):
+        value = (value << 8) | byte
+    return value
+
+
+def read_cram_header(f):
+    """
+    Header text of a CRAM file, from the first block of its header container.
+    """
+    definition = read_exact(f, 26)
+    major = definition[4]
+    if major < 2:
+        raise ValueError(f"unsupported CRAM version {major}")
+
+    # Container header; the header container has no alignments
+    read_exact(f, 4)
+    for _ in range(4):
+        read_itf8(f)
+    if major >= 3:
+        read_ltf8(f)
+    else:
+        read_itf8(f)
+    read_ltf8(f)
+    read_itf8(f)
+    for _ in range(read_itf8(f)):
+        read_itf8(f)
+    if major >= 3:
+        read_exact(f, 4)
+
+    # First block: the header text, preceded by its length
+    method = read_exact(f, 1)[0]
+    read_exact(f, 1)
+    read_itf8(f)
+    compressed_size = read_itf8(f)
+    read_itf8(f)
+    if method not in CRAM_DECOMPRESS:
+        raise ValueError(f"unsupported CRAM header compression {method}")
+    data = CRAM_DECOMPRESS[method](read_exact(f, compressed_size))
+    text_size = struct.unpack("<i", data[:4])[0]
+    return data[4:4 + text_size].decode("utf-8", "replace")
+
+
+def read_header(file_path):
+    """
+    Read the header text of a BAM or CRAM file.
+    Returns the file format ("bam" or "cram") and the header text.
+    """
+    with open_file(file_path) as f:
+        return read_header_from(f)[:2]
+
+
+def read_header_from(f):
+    """
+    Read the header text of the BAM or CRAM file open as f.
+    Returns the file format, the header text and, for BAM, the stream positioned after it.
+    """
+    magic = f.read(4)
+    f.seek(0)
+    if magic in (BGZF_MAGIC, BAM_MAGIC):
+        stream = BgzfReader(f, compressed=magic == BGZF_MAGIC)
+        return "bam", read_bam_header(stream), stream
+    if magic == CRAM_MAGIC:
+        return "cram", read_cram_header(f), None
+    raise ValueError("not a BAM or CRAM file")
+
+
+def has_rg(header_text):
+    """
+    Whether a SAM header text has @RG lines.
+    """
+    return header_text.startswith("@RG") or "\n@RG" in header_text
+
+
+def rg_lines(header_text):
+    """
+    @RG lines of a SAM header text.
+    """
+    return [line for line in header_text.splitlines() if line.startswith("@RG")]
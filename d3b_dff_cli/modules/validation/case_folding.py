@@ -0,0 +1,22 @@
+"""
+Case-insensitive matching of manifest values against schema values.
+
+Manifest values keep their original case, so reports show them as submitted.
+Schema values (allowed values, dependencies) are case-folded once when the
+schema is compiled, and manifest strings are folded while they are compared.
+Values that aren't strings are compared as they are.
+"""
+
+
+def casefold(value):
+    """
+    Case-fold a string, leave other values unchanged.
+    """
+    return value.casefold() if isinstance(value, str) else value
+
+
+def fold_values(values):
+    """
+    Case-fold a list of schema values.
+    """
+    return [casefold(value) for value in values]
@@ -1,9 +1,27 @@
-from cerberus import Validator
+import re
+from collections.abc import Mapping, Sequence
+from cerberus import Validator, errors
 import warnings
+from .case_folding import casefold, fold_values
+from .custom_checks import compile_custom_checks
 
 # Suppress specific UserWarnings from Cerberus
 warnings.filterwarnings("ignore", category=UserWarning, module="cerberus.validator")
 
+def dependency_values(values):
+    """
+    Values a dependency allows, as a list.
+    """
+    if not isinstance(values, Sequence) or isinstance(values, str):
+        return [values]
+    return values
+
+def compile_regex(pattern):
+    """
+    Compile a schema regex to match whole values, ignoring case.
+    """
+    return re.compile(pattern if pattern.endswith('$') else pattern + '$', re.IGNORECASE)
+
 class CustomValidator(Validator):
     def __init__(self, schema, rules=None, *args, **kwargs):
         """
@@ -11,58 +29,107 @@ class CustomValidator(Validator):
         """
         super().__init__(schema, *args, **kwargs)
         self.custom_rules = rules or {}
+        # Lookups of the custom checks are prepared once, not on every row
+        self.custom_checks = compile_custom_checks(self.custom_rules)
+        # Normalizing re-validates every field definition on each document, so only
+        # do it when the schema uses normalization rules (coerce, default, rename...)
+        self.normalize = any(
+            rule in self.normalization_rules
+            for definition in self.schema.values()
+            for rule in definition
+        )
+        # Allowed values, dependencies and regexes are folded and compiled once per schema
+        self.allowed = {}
+        self.dependencies = {}
+        self.regexes = {}
+        for field, definition in self.schema.items():
+            if isinstance(definition.get('allowed'), Sequence):
+                self.allowed[field] = set(fold_values(definition['allowed']))
+            if isinstance(definition.get('dependencies'), Mapping):
+                self.dependencies[field] = {
+                    name: set(fold_values(dependency_values(values)))
+                    for name, values in definition['dependencies'].items()
+                }
+            if isinstance(definition.get('regex'), str):
+                self.regexes[definition['regex']] = compile_regex(definition['regex'])
 
     def _check_dependencies(self, field, document):
         """
         Check if the field's dependencies are met.
         """
-        dependencies = self.schema.get(field, {}).get('dependencies', {})
-        for dependency_field, allowed_values in dependencies.items():
-            dependency_value = document.get(dependency_field)
-            if isinstance(allowed_values, list):
-                if dependency_value not in allowed_values:
-                    return False
-            else:
-                if dependency_value != allowed_values:
-                    return False
+        for dependency_field, allowed_values in self.dependencies.get(field, {}).items():
+            if casefold(document.get(dependency_field)) not in allowed_values:
+                return False
         return True
 
-    def _validate_custom_rules(self, field, value):
+    def _validate_allowed(self, allowed_values, field, value):
+        """
+        Allowed values are matched ignoring the case of strings.
+
+        The rule's arguments are validated against this schema:
+        {'type': 'container'}
+        """
+        folded = self.allowed.get(field)
+        if folded is None:
+            folded = fold_values(allowed_values)
+        if casefold(value) not in folded:
+            self._error(field, errors.UNALLOWED_VALUE, value)
+
+    def _validate_regex(self, pattern, field, value):
+        """
+        Regexes are matched ignoring case.
+
+        The rule's arguments are validated against this schema:
+        {'type': 'string'}
+        """
+        if not isinstance(value, str):
+            return
+        regex = self.regexes.get(pattern)
+        if regex is None:
+            regex = self.regexes[pattern] = compile_regex(pattern)
+        if not regex.match(value):
+            self._error(field, errors.REGEX_MISMATCH)
+
+    def _validate_dependencies(self, dependencies, field, value):
         """
-        Apply custom validation rules that are beyond the default Cerberus validation.
+        Dependencies on field values are matched ignoring the case of strings.
+
+        The rule's arguments are validated against this schema:
+        {'type': ('dict', 'hashable', 'list'), 'check_with': 'dependencies'}
         """
-        if field == 'file_name':
-            file_format = self.document.get('file_format')
-            if file_format:
-                extensions = self.custom_rules.get('file_name_extensions')
-                expected_extension = extensions.get(file_format)
-                if expected_extension and not value.lower().endswith(expected_extension):
-                    self._error(field, f"{field} must end with {expected_extension} for file_format '{file_format}'.")
-                    return False
-
-        if field == 'file_size':
-            file_format = self.document.get('file_format')
-            experiment = self.document.get("experiment_strategy")
-            byte_cutoff_general = self.custom_rules.get('file_size_byte_cutoff').get('general_cutoff')
-            byte_cutoff_wgs_wxs = self.custom_rules.get('file_size_byte_cutoff').get('wgs_wxs_cutoff')
-            dependencies_format = self.custom_rules.get('file_size_byte_cutoff').get('dependencies').get('file_format')
-
-            minum_value = byte_cutoff_wgs_wxs if experiment in ["wgs", "wxs", "wes"] else byte_cutoff_general
-
-            if file_format in dependencies_format:
-                if value < minum_value:
-                    self._error(field, f"[Warning] must be at least {minum_value} for file_format '{file_format}'.")
-                    return False
+        if not isinstance(dependencies, Mapping):
+            return super()._validate_dependencies(dependencies, field, value)
+        folded = self.dependencies.get(field)
+        if folded is None:
+            folded = {name: fold_values(dependency_values(values)) for name, values in dependencies.items()}
+        error_info = {}
+        for dependency_name, allowed_values in folded.items():
+            dependency_value = self._lookup_field(dependency_name)[1]
+            if casefold(dependency_value) not in allowed_values:
+                error_info[dependency_name] = dependency_value
+        if error_info:
+            self._error(field, errors.DEPENDENCIES_FIELD_VALUE, error_info)
+            # Like Cerberus, stop validating the field after a dependencies error
+            return True
 
+    def _validate_custom_rules(self, field, value):
+        """
+        Apply the custom checks of the field that are beyond the default Cerberus validation.
+        """
+        for check, prepared in self.custom_checks.get(field, ()):
+            message = check.check_value(prepared, value, self.document)
+            if message:
+                self._error(field, message)
+                return False
         return True
 
     
     def validate(self, document, *args, **kwargs):
         """
         Override validate method to first check dependencies, then apply default and custom validation.
+        The same validator can be reused for many documents: Cerberus resets self.document
+        and the error state at the start of every validation.
         """
-        self.document = document
-
         # Prepare filtered document with fields that meet dependencies
         filtered_document = {}
         for field in self.schema:
@@ -70,6 +137,10 @@ class CustomValidator(Validator):
                 filtered_document[field] = document.get(field)
 
         # Perform default validation
+        kwargs.setdefault('normalize', self.normalize)
+        # Every field missing from the filtered document failed its dependencies, so
+        # Cerberus' required-field errors would be filtered out below anyway
+        kwargs.setdefault('update', True)
         super().validate(filtered_document, *args, **kwargs)
 
         for field, value in filtered_document.items():
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""
+Cross-check the @RG lines of BAM/CRAM files with the manifest rows describing them.
+
+Rows whose file_format is BAM or CRAM are matched to the files under a root
+directory through an index of its file names, built with one walk of the
+directory. The headers of the files are read in parallel, decompressing only
+their header blocks, and joined to the rows on file_name, with one row per @RG
+line. The fields of every @RG line are then compared with the row:
+    - SM with sample_id
+    - PL with platform, ignoring case, spaces and punctuation
+    - PU with flow_cell_barcode and lane_number, when the row has them: one @RG
+      line of the file must have a PU starting with {barcode}.{lane}
+    - LB must be present, the manifest has no library column
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from ...cli import positive_int
+from .bam_header import rg_lines
+from .check_manifest import load_data
+from .check_readgroup import read_header_text
+from .cross_row_checks import text_column
+
+MANIFEST_FIELDS = ["file_name", "file_format", "sample_id", "platform", "flow_cell_barcode", "lane_number"]
+BAM_FORMATS = ["bam", "cram"]
+RG_FIELDS = ["ID", "SM", "PL", "PU", "LB"]
+REPORT_COLUMNS = ["row", "file_name", "read_group", "field", "bam_value", "manifest_field", "manifest_value", "message"]
+
+# @RG PL values naming a manifest platform differently, after normalize_platform
+PLATFORM_ALIASES = {
+    "complete": "completegenomics",
+    "nanopore": "ont",
+    "oxfordnanopore": "ont",
+}
+
+
+def index_bam_files(bam_dir):
+    """
+    Index the BAM/CRAM files under bam_dir by file name, and by path relative to bam_dir.
+    """
+    index = {}
+    for root, _, files in os.walk(bam_dir):
+        relative_root = os.path.relpath(root, bam_dir)
+        for name in files:
+            if name.lower().endswith((".bam", ".cram")):
+                path = os.path.join(root, name)
+                index.setdefault(name, []).append(path)
+                if relative_root != ".":
+                    index.setdefault(os.path.join(relative_root, name), []).append(path)
+    return index
+
+
+def resolve_file(index, file_name):
+    """
+    Path of the file of a manifest file_name, or the error message when there is none or several.
+    """
+    paths = index.get(os.path.normpath(file_name), [])
+    if not paths:
+        return None, f"No file named {file_name} under the BAM directory."
+    if len(paths) > 1:
+        return None, f"Several files named {file_name} under the BAM directory: {', '.join(sorted(paths)[:3])}."
+    return paths[0], None
+
+
+def parse_rg_line(line):
+    """
+    Fields of an @RG header line.
+    """
+    return dict(item.split(":", 1) for item in line.split("\t")[1:] if ":" in item)
+
+
+def read_groups(path):
+    """
+    Fields of the @RG lines of a BAM/CRAM file, or the error message when its header can't be read.
+    """
+    try:
+        _, header_text = read_header_text(path)
+        return [parse_rg_line(line) for line in rg_lines(header_text)], None
+    except Exception as e:
+        return [], f"Error reading the header of {path}: {e}"
+
+
+def extract_read_groups(paths, workers=1):
+    """
+    Read the @RG lines of every file, in a pool of worker processes when workers is above 1.
+    Returns a DataFrame indexed by path with one row per @RG line, and one row
+    holding the error of every file without @RG lines.
+    """
+    if workers > 1:
+        # Batch the files sent to workers: header reads take milliseconds
+        chunksize = max(1, len(paths) // (workers * 16))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(read_groups, paths, chunksize=chunksize))
+    else:
+        results = [read_groups(path) for path in paths]
+
+    records = []
+    for path, (groups, error) in zip(paths, results):
+        if error or not groups:
+            records.append({"path": path, "header_error": error or f"No @RG line in the header of {path}."})
+        for group in groups:
+            records.append({"path": path, **{field: group.get(field) for field in RG_FIELDS}})
+    return pd.DataFrame(records, columns=["path", "header_error"] + RG_FIELDS).set_index("path")
+
+
+def manifest_text(manifest, field):
+    """
+    Values of a manifest column as stripped strings, with integral numbers
+    without decimals and missing values as None.
+    """
+    text = text_column(manifest, field)
+    return text.where(text != "", None)
+
+
+def normalize_platform(value):
+    value = re.sub(r"[^0-9a-z]", "", value.casefold())
+    return PLATFORM_ALIASES.get(value, value)
+
+
+def mismatches(rows, mask, field, message, manifest_field=None, manifest_values=None):
+    """
+    Report lines of the joined rows selected by mask.
+    """
+    selected = rows[mask]
+    if manifest_values is None and manifest_field:
+        manifest_values = rows[manifest_field]
+    return pd.DataFrame({
+        "row": selected["row"],
+        "file_name": selected["file_name"],
+        "read_group": selected["ID"],
+        "field": field,
+        "bam_value": selected[field] if field in rows else None,
+        "manifest_field": manifest_field,
+        "manifest_value": manifest_values[mask] if manifest_values is not None else None,
+        "message": message[mask] if isinstance(message, pd.Series) else message,
+    }, columns=REPORT_COLUMNS)
+
+
+def compare_read_groups(joined):
+    """
+    Compare the @RG fields of the joined frame, with one row per manifest row and
+    @RG line, with the manifest fields. Returns the mismatch report.
+    """
+    failed = joined["error"].notna()
+    reports = [mismatches(joined, failed, "file", joined["error"])]
+    rows = joined[~failed]
+
+    for field in ["SM", "PL", "PU", "LB"]:
+        reports.append(mismatches(rows, rows[field].isna(), field, f"@RG has no {field} field."))
+
+    sample = rows["SM"].notna() & rows["sample_id"].notna() & (rows["SM"] != rows["sample_id"])
+    reports.append(mismatches(rows, sample, "SM", "SM doesn't match sample_id.", "sample_id"))
+
+    platform = rows["PL"].notna() & rows["platform"].notna()
+    platform &= rows["platform"].str.casefold() != "other"
+    platform &= (
+        rows["PL"].map(normalize_platform, na_action="ignore")
+        != rows["platform"].map(normalize_platform, na_action="ignore")
+    )
+    reports.append(mismatches(rows, platform, "PL", "PL doesn't match platform.", "platform"))
+
+    # PU is {flow cell barcode}.{lane}[.{sample barcode}]: an @RG line of the file must start with them
+    expected = rows["flow_cell_barcode"].where(
+        rows["lane_number"].isna(), rows["flow_cell_barcode"] + "." + rows["lane_number"]
+    )
+    matched = pd.Series(
+        [
+            isinstance(pu, str) and isinstance(unit, str) and (pu == unit or pu.startswith(unit + "."))
+            for pu, unit in zip(rows["PU"], expected)
+        ],
+        index=rows.index,
+    )
+    unmatched = expected.notna() & rows["PU"].notna() & ~matched.groupby(rows["row"]).transform("any")
+    reports.append(mismatches(
+        rows, unmatched, "PU", "No @RG line has a PU starting with flow_cell_barcode.lane_number.",
+        "flow_cell_barcode.lane_number", expected,
+    ))
+
+    reports = [report for report in reports if len(report)]
+    if not reports:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = pd.concat(reports, ignore_index=True)
+    return report.sort_values(["row", "read_group", "field"], na_position="first", kind="stable", ignore_index=True)
+
+
+def cross_check(manifest_file, bam_dir, workers=1, csv_reader="auto"):
+    """
+    Cross-check the BAM/CRAM rows of a manifest with the @RG lines of their files under bam_dir.
+    Returns the mismatch report and the number of BAM/CRAM rows.
+    """
+    manifest = load_data(manifest_file, csv_reader=csv_reader, columns=MANIFEST_FIELDS)
+    missing = [field for field in MANIFEST_FIELDS if field not in manifest.columns]
+    if missing:
+        raise ValueError(f"The manifest has no {', '.join(missing)} column.")
+    selected = manifest[manifest["file_format"].astype(str).str.casefold().isin(BAM_FORMATS)]
+    rows = pd.DataFrame({field: manifest_text(selected, field) for field in MANIFEST_FIELDS})
+    rows.insert(0, "row", selected.index + 1)
+
+    # Resolve every file name once, through the index of the BAM directory
+    index = index_bam_files(bam_dir)
+    files = pd.DataFrame(
+        [(file_name, *resolve_file(index, file_name)) for file_name in rows["file_name"].dropna().unique()],
+        columns=["file_name", "path", "error"],
+    ).set_index("file_name")
+    groups = extract_read_groups(sorted(files["path"].dropna().unique()), workers)
+
+    # Join the @RG lines of every file to its rows: one row per manifest row and @RG line
+    joined = rows.join(files, on="file_name").join(groups, on="path").reset_index(drop=True)
+    # Build the errors as objects: the error columns are float NaN when no file has one
+    error = joined["error"].to_numpy(dtype=object)
+    error = np.where(pd.isna(error), joined["header_error"].to_numpy(dtype=object), error)
+    error[joined["file_name"].isna().to_numpy()] = "The row has no file_name."
+    joined["error"] = pd.Series(error, index=joined.index, dtype=object)
+    return compare_read_groups(joined), len(rows)
+
+
+def print_mismatches(report):
+    """
+    Print the mismatches of every row.
+    """
+    previous_row = None
+    for line in report.itertuples(index=False):
+        if line.row != previous_row:
+            print(f"Row {line.row} ({line.file_name}):" if isinstance(line.file_name, str) else f"Row {line.row}:")
+            previous_row = line.row
+        field = f"@RG {line.read_group} {line.field}" if isinstance(line.read_group, str) else line.field
+        values = f" ({line.bam_value!r} vs {line.manifest_field} {line.manifest_value!r})" if isinstance(line.manifest_field, str) else ""
+        print(f"  {field}: {line.message}{values}")
+
+
+def write_report(report, report_file):
+    """
+    Write the mismatch report as CSV, or TSV for a .tsv file.
+    """
+    delimiter = "\t" if report_file.lower().endswith(".tsv") else ","
+    report.to_csv(report_file, sep=delimiter, index=False)
+
+
+def main(args):
+    workers = getattr(args, "workers", 1) or 1
+    start = time.perf_counter()
+    report, checked = cross_check(args.manifest_file, args.bam_dir, workers, getattr(args, "csv_reader", "auto"))
+    if report.empty:
+        print("====Validation Passed====\n  The @RG lines of every BAM/CRAM file match its manifest rows.")
+    else:
+        print("====Validation Failed====")
+        print_mismatches(report)
+    if getattr(args, "report", None):
+        write_report(report, args.report)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(
+        f"Cross-checked {checked} BAM/CRAM rows in {seconds:.2f}s: {checked / seconds:.1f} rows/s, "
+        f"{report['row'].nunique()} rows with mismatches",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-check the @RG lines of BAM/CRAM files with their manifest rows.")
+    parser.add_argument("-manifest_file", required=True, help="Manifest (CSV, TSV, Excel, Parquet or Feather).")
+    parser.add_argument("-bam_dir", required=True, help="Root directory of the BAM/CRAM files of the manifest.")
+    parser.add_argument("-workers", type=positive_int, default=1, help="Number of worker processes reading headers in parallel. Default: 1")
+    parser.add_argument("-report", default=None, help="Write the mismatches to this CSV/TSV file.")
+    args = parser.parse_args()
+    main(args)
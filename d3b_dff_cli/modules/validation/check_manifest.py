@@ -1,127 +1,882 @@
 import argparse
+import contextlib
+import glob
+import io
+import numpy as np
 import pandas as pd
 import json
 import os
+import sys
+import time
+from collections import Counter, deque
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from .cerberus_custom_checks import CustomValidator
+from .columnar_checks import compile_schema, validate_rule_set
+from .arrow_reader import (
+    ARROW_EXTENSIONS,
+    is_arrow_table,
+    iter_arrow_manifest,
+    read_arrow_manifest,
+    read_arrow_table,
+    read_csv_arrow,
+    use_arrow_csv,
+)
+from .cross_row_checks import check_cross_rows, iter_cross_rows, merge_errors
+from .excel_reader import iter_excel_manifest, read_excel_manifest, select_sheet
+from .incremental import load_state, relevant_fields, save_state, validate_incremental
+from .report import REPORT_FORMATS, RowError, ValidationReport, ValidationResult, has_errors, report_format
+from .rule_checks import DEFAULT_RULE_SET, compile_rules, evaluate_rules, load_rules
+from .schema_cache import load_cached, schema_json_key
+from ...cli import positive_int
 
 wk_dir = os.path.dirname(os.path.abspath(__file__))
 validation_schema = os.path.join(wk_dir, "validation_rules_schema.json")
 
-def load_data(manifest_file):
+MANIFEST_EXTENSIONS = ["csv", "tsv", "xls", "xlsx"] + ARROW_EXTENSIONS
+
+# Rows of a loaded manifest validated at a time when validation can stop early
+STOP_BLOCK_ROWS = 10000
+
+# Options of validate(), by command-line name, and their defaults
+DEFAULT_OPTIONS = {
+    "engine": "columnar",
+    "workers": 1,
+    "chunksize": None,
+    "csv_reader": "auto",
+    "no_cache": False,
+    "incremental": None,
+    "report": None,
+    "report_format": None,
+    "fail_fast": False,
+    "max_errors": None,
+    "cross_row": False,
+    "rules": None,
+    "rule_set": DEFAULT_RULE_SET,
+}
+
+# Schema compiled once per worker process by init_worker
+worker_state = {}
+
+# experiment_strategy values handled by each rule type; the platform takes
+# precedence for platforms with a rule type of their own
+STRATEGY_RULE_TYPES = {
+    "DNAseq_rules": ["wgs", "wxs", "wes", "target sequencing", "panel", "target"],
+    "RNAseq_rules": ["rna-seq", "rnaseq", "mirna-seq", "mirnaseq"],
+    "single_cell_rules": ["scrna-seq", "snrna-seq", "scrnaseq", "snrnaseq"],
+    "methylation_rules": ["methylation", "methylation microarray"],
+}
+PLATFORM_RULE_TYPES = {
+    "pacbio": "pacbio_longread_rules",
+}
+RULE_TYPE_BY_STRATEGY = {
+    strategy: rule_type
+    for rule_type, strategies in STRATEGY_RULE_TYPES.items()
+    for strategy in strategies
+}
+
+def string_categorical(col):
+    """
+    Convert a column of strings to a categorical of its distinct values.
+    Missing values become "nan", like astype(str) does.
     """
-    Load data from a manifest file and convert strings to lowercase.
+    codes, uniques = pd.factorize(col)
+    # Missing values have code -1, which picks the "nan" appended last
+    values = pd.Index(uniques, dtype=object).astype(str).append(pd.Index(["nan"]))
+    merged_codes, categories = pd.factorize(values)
+    return pd.Series(pd.Categorical.from_codes(merged_codes[codes], categories), index=col.index, name=col.name)
+
+def string_column(col, categorical=()):
+    """
+    Convert an object column to strings, keeping their case. Columns in categorical
+    that only hold strings and missing values are kept as categoricals.
+    """
+    if col.dtype.name not in ['object']:
+        return col
+    if col.name in categorical and pd.api.types.infer_dtype(col, skipna=True) == "string":
+        return string_categorical(col)
+    return col.astype(str)
+
+def convert_strings(manifest_data, categorical=()):
+    """
+    Convert the object columns of a manifest DataFrame to strings.
+    Values keep their case: the schema is matched case-insensitively.
     """
+    return manifest_data.apply(lambda col: string_column(col, categorical))
+
+def manifest_columns(schema_json):
+    """
+    Get the manifest columns used by the rule sets, and the ones with a fixed
+    set of allowed values, which are loaded as categoricals.
+    """
+    categorical = {"platform", "experiment_strategy"}
+    for rule_type, schema in schema_json.items():
+        if rule_type != "custom_rules":
+            categorical.update(field for field, rules in schema.items() if "allowed" in rules)
+    return relevant_fields(schema_json), categorical
+
+def read_excel_sheet(manifest_file, usecols=None):
+    """
+    Read the Genomics_Manifest sheet, or the only sheet, of an Excel manifest.
+    """
+    if manifest_file.split('.')[-1].lower() == 'xlsx':
+        return read_excel_manifest(manifest_file, usecols)
+    xlsx = pd.ExcelFile(manifest_file)
+    return pd.read_excel(xlsx, sheet_name=select_sheet(xlsx.sheet_names, manifest_file), usecols=usecols)
+
+def load_data(manifest_file, schema_json=None, csv_reader="auto", columns=None):
+    """
+    Load data from a manifest file and convert its object columns to strings.
+    When schema_json is given, only the columns used by its rule sets are read,
+    and when columns is given, only these columns.
+    Large CSV/TSV files are parsed with the Arrow CSV reader unless csv_reader is "pandas".
+    """
+    if columns is not None:
+        categorical = ()
+    else:
+        columns, categorical = manifest_columns(schema_json) if schema_json else (None, ())
+    usecols = (lambda column: column in columns) if columns else None
     file_extension = manifest_file.split('.')[-1].lower()
-    if file_extension == 'csv':
-        manifest_data = pd.read_csv(manifest_file)
-    elif file_extension == 'tsv':
-        manifest_data = pd.read_csv(manifest_file, delimiter='\t')
-    elif file_extension in ['xls', 'xlsx']:
-        xlsx = pd.ExcelFile(manifest_file)
-        if len(xlsx.sheet_names) == 1:
-            manifest_data = pd.read_excel(xlsx)
-        elif "Genomics_Manifest" in xlsx.sheet_names:
-            manifest_data = pd.read_excel(xlsx, sheet_name="Genomics_Manifest")
+    if file_extension in ['csv', 'tsv']:
+        delimiter = '\t' if file_extension == 'tsv' else ','
+        if use_arrow_csv(manifest_file, csv_reader):
+            manifest_data = read_csv_arrow(manifest_file, delimiter, usecols)
         else:
-            raise ValueError(f"Sheet 'Genomics_Manifest' not found in {manifest_file}")
+            manifest_data = pd.read_csv(manifest_file, delimiter=delimiter, usecols=usecols)
+    elif file_extension in ['xls', 'xlsx']:
+        manifest_data = read_excel_sheet(manifest_file, usecols)
+    elif file_extension in ARROW_EXTENSIONS:
+        manifest_data = read_arrow_manifest(manifest_file, usecols)
     else:
-        raise ValueError("Unsupported file format. Please provide a CSV, TSV, or Excel file.")
+        raise ValueError("Unsupported file format. Please provide a CSV, TSV, Excel, Parquet or Feather file.")
     
-    manifest_data = manifest_data.apply(lambda col: col.astype(str).str.lower() if col.dtype.name in ['object'] else col)
-    return manifest_data
+    return convert_strings(manifest_data, categorical)
 
-def convert_schema_to_lowercase(schema):
+def column_kind(col):
     """
-    Convert all string values in the schema to lowercase.
+    Kind of the values of a column as read from a chunk of a manifest: "empty"
+    when it has no value, "int", "float", "bool", "boolnan" for booleans with
+    missing values, or "str".
     """
-    for k, v in schema.items():
-        if isinstance(v, dict):
-            convert_schema_to_lowercase(v)
-        elif isinstance(v, list):
-            schema[k] = [item.lower() if isinstance(item, str) else item for item in v]
-        elif isinstance(v, str):
-            schema[k] = v.lower()
-    return schema
+    if col.isna().all():
+        return "empty"
+    if pd.api.types.is_bool_dtype(col):
+        return "bool"
+    if pd.api.types.is_integer_dtype(col):
+        return "int"
+    if pd.api.types.is_float_dtype(col):
+        return "float"
+    if col.dtype.name == 'object' and pd.api.types.infer_dtype(col, skipna=True) == "boolean":
+        return "boolnan"
+    return "str"
 
-def validate_data(df, schema_json):
+def common_kind(first, second):
     """
-    Validate the DataFrame against the schema.
+    Kind of a column whose chunks have the two kinds, as it is read from the whole file.
+    """
+    kinds = {first, second}
+    if len(kinds) == 1:
+        return first
+    if "str" in kinds:
+        return "str"
+    if kinds <= {"empty", "int", "float"}:
+        return "float"
+    if kinds <= {"empty", "bool", "boolnan"}:
+        return "boolnan"
+    # Booleans mixed with numbers are read as strings
+    return "str"
+
+def chunk_kinds(chunks):
+    """
+    Kind of every column of a manifest read in chunks, as it is read from the whole file.
+    """
+    kinds = {}
+    for chunk in chunks:
+        for name, col in chunk.items():
+            kind = column_kind(col)
+            kinds[name] = common_kind(kinds[name], kind) if name in kinds else kind
+    return kinds
+
+def pin_kinds(chunk, kinds):
+    """
+    Cast the columns of a chunk to the type of their kind in the whole file, so the
+    values of a chunk don't depend on where the file is split.
+    """
+    for name, kind in kinds.items():
+        col = chunk[name]
+        if kind == "float" and not pd.api.types.is_float_dtype(col):
+            chunk[name] = col.astype("float64")
+        elif kind in ("boolnan", "str") and col.dtype.name != 'object':
+            chunk[name] = col.astype(object)
+    return chunk
+
+def iter_data(manifest_file, chunksize, schema_json=None):
+    """
+    Load a manifest file in chunks of at most chunksize rows, converting object columns to strings.
+    The index of every chunk continues from the previous one, so row numbers stay global.
+    When schema_json is given, only the columns used by its rule sets are read.
+    Columns are typed as in the whole file, from a first pass over its chunks.
+    """
+    columns, categorical = manifest_columns(schema_json) if schema_json else (None, ())
+    usecols = (lambda column: column in columns) if columns else None
+    file_extension = manifest_file.split('.')[-1].lower()
+    if file_extension in ['csv', 'tsv']:
+        delimiter = '\t' if file_extension == 'tsv' else ','
+        with pd.read_csv(manifest_file, delimiter=delimiter, chunksize=chunksize, usecols=usecols) as reader:
+            kinds = chunk_kinds(reader)
+        # Parse numbers and strings with their whole-file type: strings keep their text
+        dtypes = {"int": "int64", "float": "float64", "str": str}
+        dtype = {name: dtypes[kind] for name, kind in kinds.items() if kind in dtypes}
+        with pd.read_csv(manifest_file, delimiter=delimiter, chunksize=chunksize, usecols=usecols, dtype=dtype) as reader:
+            for chunk in reader:
+                yield convert_strings(pin_kinds(chunk, kinds), categorical)
+    elif file_extension == 'xlsx':
+        kinds = chunk_kinds(iter_excel_manifest(manifest_file, chunksize, usecols))
+        for chunk in iter_excel_manifest(manifest_file, chunksize, usecols):
+            yield convert_strings(pin_kinds(chunk, kinds), categorical)
+    elif file_extension == 'xls':
+        # Legacy .xls workbooks can't be streamed; split the loaded sheet instead
+        manifest_data = convert_strings(read_excel_sheet(manifest_file, usecols), categorical)
+        for start in range(0, len(manifest_data), chunksize):
+            yield manifest_data.iloc[start:start + chunksize]
+    elif file_extension in ARROW_EXTENSIONS:
+        kinds = chunk_kinds(iter_arrow_manifest(manifest_file, chunksize, usecols))
+        for chunk in iter_arrow_manifest(manifest_file, chunksize, usecols):
+            yield convert_strings(pin_kinds(chunk, kinds), categorical)
+    else:
+        raise ValueError("Unsupported file format. Please provide a CSV, TSV, Excel, Parquet or Feather file.")
+
+def prepare_frame(df):
+    """
+    Prepare a DataFrame held in memory for validation without copying its data.
+    Columns that only hold strings are used as they are; the other object columns
+    are converted to strings, and the rows are numbered from 1, in a shallow copy.
+    """
+    frame = df
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        frame = df.copy(deep=False)
+        frame.index = pd.RangeIndex(len(df))
+    for name, col in df.items():
+        if col.dtype.name == 'object' and pd.api.types.infer_dtype(col, skipna=False) != "string":
+            if frame is df:
+                frame = df.copy(deep=False)
+            frame[name] = col.astype(str).to_numpy()
+    return frame
+
+def manifest_frame(manifest, schema_json=None, csv_reader="auto"):
+    """
+    Get a manifest file, DataFrame or Arrow table as a DataFrame ready for validation.
+    """
+    if isinstance(manifest, pd.DataFrame):
+        return prepare_frame(manifest)
+    if is_arrow_table(manifest):
+        columns, categorical = manifest_columns(schema_json) if schema_json else (None, ())
+        usecols = (lambda column: column in columns) if columns else None
+        return convert_strings(read_arrow_table(manifest, usecols), categorical)
+    return load_data(os.fspath(manifest), schema_json, csv_reader)
+
+def iter_manifest(manifest, chunksize, schema_json=None):
+    """
+    Get a manifest file, DataFrame or Arrow table in chunks of at most chunksize rows.
+    """
+    if isinstance(manifest, pd.DataFrame) or is_arrow_table(manifest):
+        df = manifest_frame(manifest, schema_json)
+        return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+    return iter_data(os.fspath(manifest), chunksize, schema_json)
+
+def prepare_schema(schema_file=validation_schema):
+    """
+    Load the validation schema and compile it for the columnar engine, which
+    case-folds its allowed values once.
+    """
+    with open(schema_file, 'r') as f:
+        schema_json = json.load(f)
+    return schema_json, compile_schema(schema_json)
+
+def load_schema(schema_file=validation_schema, use_cache=True):
+    """
+    Get the schema and its compiled columnar checks, from the on-disk
+    cache unless use_cache is False.
+    """
+    if use_cache:
+        return load_cached(schema_file, prepare_schema)
+    return prepare_schema(schema_file)
+
+def build_validator_pool(schema_json):
+    """
+    Build one CustomValidator per rule type, to be reused for every row of that type.
     """
-    valid = True
-    errors = []
     custom_rules = schema_json.get('custom_rules', {})
-    
+    return {
+        rule_type: CustomValidator(schema, custom_rules)
+        for rule_type, schema in schema_json.items()
+        if rule_type != 'custom_rules'
+    }
+
+def compile_validators(schema_json, engine="columnar"):
+    """
+    Prepare the schema once for the given engine: compiled column checks for the
+    columnar engine, a validator pool for the cerberus engine.
+    """
+    if engine == "columnar":
+        return compile_schema(schema_json)
+    if engine == "cerberus":
+        return build_validator_pool(schema_json)
+    raise ValueError(f"Unsupported validation engine: {engine}")
+
+def get_rule_type(platform, experiment_strategy):
+    """
+    Get the rule type of a (platform, experiment_strategy) pair, or None if unsupported.
+    """
+    platform = str(platform).casefold()
+    experiment_strategy = str(experiment_strategy).casefold()
+    return PLATFORM_RULE_TYPES.get(platform) or RULE_TYPE_BY_STRATEGY.get(experiment_strategy)
+
+def classify_rule_types(df):
+    """
+    Get the rule type of every row. Each distinct (platform, experiment_strategy)
+    pair is looked up once and the result is broadcast to its rows; rows with an
+    unsupported experiment_strategy get None.
+    """
+    if df.empty:
+        return pd.Series(None, index=df.index, dtype=object)
+    columns = [
+        df[column].to_numpy(dtype=object) if column in df.columns else np.full(len(df), "", dtype=object)
+        for column in ("platform", "experiment_strategy")
+    ]
+    codes, pairs = pd.MultiIndex.from_arrays(columns).factorize()
+    lookup = np.array([get_rule_type(platform, strategy) for platform, strategy in pairs], dtype=object)
+    return pd.Series(lookup[codes], index=df.index)
+
+def validate_rows(df, schema, validator):
+    """
+    Validate the rows of df one by one with a CustomValidator.
+    Returns the error dict of every row (empty dict when valid).
+    """
+    row_errors = []
     for index, row in df.iterrows():
-        experiment_strategy = row.get("experiment_strategy", "").lower()
-        platform = row.get("platform", "").lower()
-        
-        if platform == "pacbio":
-            rule_type = "pacbio_longread_rules"
-        else:
-            if experiment_strategy in ["wgs", "wxs", "wes", "target sequencing", "panel", "target"]:
-                rule_type = "DNAseq_rules"
-            elif experiment_strategy in ["rna-seq", "rnaseq", "mirna-seq", "mirnaseq"]:
-                rule_type = "RNAseq_rules"
-            elif experiment_strategy in ["scrna-seq", "snrna-seq", "scrnaseq", "snrnaseq"]:
-                rule_type = "single_cell_rules"
-            elif experiment_strategy in ["methylation", "methylation microarray"]:
-                rule_type = "methylation_rules"
-            else:
-                raise ValueError(f"Unsupported experiment_strategy for Row {index + 1}")
-        
-        schema = schema_json.get(rule_type, {})
-        
         # Filter out fields not in the schema fields for combined manifest
         row_dict = row.to_dict()
         filtered_row_dict = {k: v for k, v in row_dict.items() if k in schema}
-        
-        v = CustomValidator(schema, custom_rules)
-        (is_valid, out_error) = v.validate(filtered_row_dict)
-        
-        if not is_valid:
-            valid = False
-            errors.append({
-                'row': index + 1,
-                'errors': out_error
-            })
-    
-    return valid, errors
+        (is_valid, out_error) = validator.validate(filtered_row_dict)
+        row_errors.append(out_error)
+    return row_errors
 
-def main(args):
+def validate_data(df, schema_json, engine="columnar", compiled=None):
     """
-    Main function to load schema, validate data, and print the validation report.
+    Validate the DataFrame against the schema.
+    Rows are grouped by rule type and each group is validated together.
+    The columnar engine evaluates whole columns at once; the cerberus engine
+    validates row by row and is kept as the reference implementation.
+    compiled can be passed to reuse the output of compile_validators across calls.
     """
-    with open(validation_schema, 'r') as f:
-        schema = json.load(f)
-    
-    schema_json = convert_schema_to_lowercase(schema)
+    if compiled is None:
+        compiled = compile_validators(schema_json, engine)
+
+    rule_types = classify_rule_types(df).fillna("").to_numpy()
+    experiment_strategy = df["experiment_strategy"] if "experiment_strategy" in df.columns else pd.Series("", index=df.index)
+
+    errors_by_position = {}
+    for rule_type, positions in pd.Series(rule_types).groupby(rule_types, sort=False).indices.items():
+        if not rule_type:
+            for position in positions:
+                errors_by_position[position] = {
+                    "experiment_strategy": [f"Unsupported experiment_strategy '{experiment_strategy.iloc[position]}'"]
+                }
+            continue
+
+        if rule_type not in compiled:
+            # A schema without this rule set has no checks for its rows
+            continue
+        schema = schema_json.get(rule_type, {})
+        if engine == "columnar":
+            # Filter out fields not in the schema fields for combined manifest
+            columns = [column for column in df.columns if column in schema]
+            row_errors = validate_rule_set(df.iloc[positions][columns], compiled[rule_type], compiled["custom_rules"])
+        else:
+            row_errors = validate_rows(df.iloc[positions], schema, compiled[rule_type])
+
+        for position, out_error in zip(positions, row_errors):
+            if out_error:
+                errors_by_position[position] = out_error
+
+    errors = [
+        {'row': df.index[position] + 1, 'errors': errors_by_position[position]}
+        for position in sorted(errors_by_position)
+    ]
+    return not errors, errors
+
+def init_worker(schema_json, engine, compiled=None, rules=None):
+    """
+    Set up the compiled schema, or the compiled rules, once in each worker process of the validation pool.
+    """
+    worker_state["schema_json"] = schema_json
+    worker_state["engine"] = engine
+    worker_state["rules"] = rules
+    if compiled is None and rules is None:
+        compiled = compile_validators(schema_json, engine)
+    worker_state["compiled"] = compiled
+
+def validate_partition(df):
+    """
+    Validate one partition of the manifest inside a worker process, with the
+    compiled rules when the pool was started with them.
+    """
+    if worker_state["rules"] is not None:
+        return evaluate_rules(df, worker_state["rules"])
+    return validate_data(df, worker_state["schema_json"], worker_state["engine"], worker_state["compiled"])
+
+def split_rows(df, partitions):
+    """
+    Split a DataFrame into at most partitions contiguous row ranges.
+    """
+    size = max(1, -(-len(df) // partitions))
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
 
-    # Load and preprocess the data
-    df = load_data(args.manifest_file)
+def start_pool(schema_json, engine, workers, compiled=None, rules=None):
+    """
+    Start a process pool whose workers hold the compiled schema.
+    The schema is sent to each worker once, when the worker starts.
+    """
+    # Cerberus validators can't be pickled, so cerberus workers build their own pool
+    if engine != "columnar":
+        compiled = None
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(schema_json, engine, compiled, rules))
 
-    # Validate the data
-    valid, errors = validate_data(df, schema_json)
+def iter_parallel(partitions, executor, workers):
+    """
+    Validate DataFrame partitions in a process pool and yield the (valid, errors)
+    result of each partition in input order. At most two partitions per worker
+    are in flight, so partitions read from a stream are not all held in memory.
+    """
+    pending = deque()
+    try:
+        for partition in partitions:
+            pending.append(executor.submit(validate_partition, partition))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Closed early: don't run the partitions still queued
+        for future in pending:
+            future.cancel()
 
-    # Print validation report
+def validate_data_parallel(df, executor, workers):
+    """
+    Validate the DataFrame in row partitions across the workers of executor.
+    Returns the same report, in the same row order, as validate_data.
+    """
+    valid = True
+    errors = []
+    for partition_valid, partition_errors in iter_parallel(split_rows(df, workers * 4), executor, workers):
+        valid = valid and partition_valid
+        errors.extend(partition_errors)
+    return valid, errors
+
+def print_status(valid, warnings_only):
+    """
+    Print the overall validation status.
+    """
     if valid:
         print("====Validation Passed====\n  All rows are valid.")
+    elif warnings_only:
+        print("====Validation Warnings====")
     else:
-        # Check if all warning messages
-        only_warnings = all("Warning" in field_error for error in errors for field_errors in error['errors'].values() for field_error in field_errors)
+        print("====Validation Failed====")
 
-        if only_warnings:
-            print("====Validation Warnings====")
+def print_errors(errors):
+    """
+    Print the field errors of every invalid row, with the row they relate to.
+    """
+    for error in errors:
+        print(f"Row {error['row']}:")
+        related = error.get('related', {})
+        for field, field_errors in error['errors'].items():
+            detail = ""
+            if field in related:
+                value = f": {related[field]['value']!r}" if "value" in related[field] else ""
+                detail = f" (row {related[field]['row']}{value})"
+            for field_error in field_errors:
+                print(f"  {field}: {field_error}{detail}")
+
+def print_stopped(stopped_at_row):
+    """
+    Tell where validation stopped when the error limit was reached.
+    """
+    if stopped_at_row is not None:
+        print(f"  Stopped at row {stopped_at_row}: error limit reached, later rows are not reported.")
+
+def print_summary(summary):
+    """
+    Print one line per distinct error with the number of rows and the row ranges it occurs in.
+    """
+    for entry in summary['errors']:
+        ranges = ",".join(f"{start}-{end}" if start != end else str(start) for start, end in entry['row_ranges'][:10])
+        if entry['ranges_truncated'] or len(entry['row_ranges']) > 10:
+            ranges += ",..."
+        print(f"  {entry['field']}: {entry['message']} ({entry['count']} rows: {ranges})")
+
+def limit_errors(results, report, max_errors):
+    """
+    Pass on the (valid, errors) of every chunk until max_errors rows have errors;
+    rows with only warnings don't count. The errors of the chunk reaching the
+    limit are cut after that row, which is recorded in report.stopped_at, and
+    results is closed, which stops reading the manifest and cancels queued partitions.
+    """
+    failed = 0
+    for valid, errors in results:
+        for position, error in enumerate(errors):
+            if has_errors(error):
+                failed += 1
+                if failed >= max_errors:
+                    report.stopped_at = int(error['row'])
+                    results.close()
+                    yield False, errors[:position + 1]
+                    return
+        yield valid, errors
+
+def timed_chunks(chunks, stats):
+    """
+    Pass on the chunks of a streamed manifest, counting their rows and the time spent reading them.
+    """
+    chunks = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        stats["load"] += time.perf_counter() - start
+        if chunk is None:
+            return
+        stats["rows"] += len(chunk)
+        yield chunk
+
+def validate_manifest(manifest, args, schema_json, compiled, executor=None, rules=None, on_errors=None, keep_errors=True):
+    """
+    Validate a manifest file, DataFrame or Arrow table according to the options in args, without printing.
+    When compiled condition/consequence rules are given, they are evaluated instead of the schema.
+    on_errors is called with the row errors of every validated chunk as soon as they are found.
+    Returns a ValidationResult, with the errors of every row unless keep_errors is False.
+    """
+    start = time.perf_counter()
+    engine = getattr(args, "engine", "columnar")
+    workers = getattr(args, "workers", 1) or 1
+    chunksize = getattr(args, "chunksize", None)
+    csv_reader = getattr(args, "csv_reader", "auto")
+    state_file = getattr(args, "incremental", None)
+    cross_row = getattr(args, "cross_row", False)
+    max_errors = 1 if getattr(args, "fail_fast", False) else getattr(args, "max_errors", None)
+    report_file = getattr(args, "report", None)
+    fmt = report_format(report_file, getattr(args, "report_format", None)) if report_file else None
+    report = ValidationReport(ndjson_file=report_file if fmt == "ndjson" else None)
+    stats = {"rows": 0, "load": 0.0}
+    row_errors = [] if keep_errors else None
+
+    def validate(df):
+        if executor is not None:
+            return validate_data_parallel(df, executor, workers)
+        if rules is not None:
+            return evaluate_rules(df, rules)
+        return validate_data(df, schema_json, engine, compiled)
+
+    if state_file:
+        # Only rows that are new or changed since the last run are validated,
+        # with the schema the state was saved with
+        schema_key = schema_json_key(schema_json)
+        fields = relevant_fields(schema_json)
+        cached = load_state(state_file, schema_key)
+        results = {}
+        counts = {"revalidated": 0}
+        validate_rows_of = validate
+
+        def validate(df):
+            valid, errors, df_results, revalidated = validate_incremental(df, fields, cached, validate_rows_of)
+            results.update(df_results)
+            counts["revalidated"] += revalidated
+            return valid, errors
+
+    def validate_chunks(chunks):
+        if executor is not None and not state_file:
+            return iter_parallel(chunks, executor, workers)
+        return (validate(chunk) for chunk in chunks)
+
+    def checked_chunks(chunks, spill):
+        results = iter_cross_rows(chunks, validate_chunks, spill, max_errors) if cross_row else validate_chunks(chunks)
+        return limit_errors(results, report, max_errors) if max_errors is not None else results
+
+    def collect(errors):
+        report.add(errors)
+        if on_errors is not None and errors:
+            on_errors(errors)
+        if keep_errors:
+            row_errors.extend(RowError(int(error['row']), error['errors'], error.get('related')) for error in errors)
+
+    if chunksize:
+        # Cross-row indexes of streamed manifests spill to a temporary file
+        chunks = iter_manifest(manifest, chunksize, schema_json)
+        for _, errors in checked_chunks(timed_chunks(chunks, stats), spill=True):
+            collect(errors)
+    else:
+        # Load and preprocess the data
+        load_start = time.perf_counter()
+        df = manifest_frame(manifest, schema_json, csv_reader)
+        stats["load"] = time.perf_counter() - load_start
+        stats["rows"] = len(df)
+
+        # Validate the data
+        if max_errors is not None:
+            # Validate in blocks, to stop once max_errors rows have errors
+            blocks = split_rows(df, max(1, -(-len(df) // STOP_BLOCK_ROWS)))
+            errors = [error for _, block_errors in checked_chunks(blocks, spill=False) for error in block_errors]
         else:
-            print("====Validation Failed====")
-        
-        for error in errors:
-            print(f"Row {error['row']}:")
-            for field, field_errors in error['errors'].items():
-                for field_error in field_errors:
-                    print(f"  {field}: {field_error}")
+            _, errors = validate(df)
+            if cross_row:
+                _, cross_errors = check_cross_rows(df)
+                errors = merge_errors(errors, cross_errors)
+        collect(errors)
+
+    summary = report.close(report_file, fmt)
+    if keep_errors:
+        # Rows held back by the cross-row checks come after later rows
+        row_errors.sort(key=lambda error: error.row)
+
+    if state_file:
+        save_state(state_file, schema_key, results)
+    total = time.perf_counter() - start
+    timings = {"load": stats["load"], "validate": total - stats["load"], "total": total}
+    return ValidationResult(summary, stats["rows"], row_errors, timings, counts["revalidated"] if state_file else None)
+
+def run_validation(args, schema_json, compiled, executor=None, rules=None):
+    """
+    Validate the manifest according to the command-line options and print the report.
+    Streamed manifests (-chunksize) print the row errors of every chunk as soon as it is validated.
+    Returns the validation summary.
+    """
+    summary_only = getattr(args, "summary", False)
+    streamed = bool(getattr(args, "chunksize", None))
+    on_errors = print_errors if streamed and not summary_only else None
+    result = validate_manifest(
+        args.manifest_file, args, schema_json, compiled, executor, rules,
+        on_errors=on_errors, keep_errors=not streamed and not summary_only,
+    )
+
+    print_status(result.valid, result.status == "warnings")
+    print_stopped(result.stopped_at_row)
+    if summary_only:
+        print_summary(result.summary)
+    elif not streamed:
+        print_errors(error.to_dict() for error in result.row_errors)
+
+    if result.revalidated is not None:
+        print(f"Re-validated {result.revalidated} of {result.rows} rows.", file=sys.stderr)
+    return result.summary
+
+def expand_manifest_files(paths):
+    """
+    Expand manifest files, directories and glob patterns into a list of manifest files.
+    Directories contribute their CSV, TSV, Excel, Parquet and Feather files.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.split('.')[-1].lower() in MANIFEST_EXTENSIONS and os.path.isfile(os.path.join(path, name))
+            ))
+        elif glob.has_magic(path):
+            files.extend(sorted(match for match in glob.glob(path) if os.path.isfile(match)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+def batch_report_files(manifest_files, report_dir, fmt):
+    """
+    Name the report of every manifest of a batch after the manifest file.
+    """
+    report_files = []
+    for manifest_file in manifest_files:
+        name = os.path.basename(manifest_file)
+        report_file = os.path.join(report_dir, f"{name}.{fmt}")
+        copy = 1
+        while report_file in report_files:
+            copy += 1
+            report_file = os.path.join(report_dir, f"{name}-{copy}.{fmt}")
+        report_files.append(report_file)
+    return report_files
+
+def validate_manifest_file(options, manifest_file, report_file=None):
+    """
+    Validate one manifest of a batch with the schema set up by init_worker.
+    Returns the printed report and the validation summary.
+    """
+    args = argparse.Namespace(**options, manifest_file=manifest_file, report=report_file)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            summary = run_validation(args, worker_state["schema_json"], worker_state["compiled"], rules=worker_state["rules"])
+    except Exception as e:
+        # One unreadable manifest shouldn't stop the batch
+        print(f"  Could not validate {manifest_file}: {e}", file=output)
+        summary = {"status": "error", "error": str(e)}
+    return output.getvalue(), summary
+
+def run_batch(args, manifest_files, schema_json, compiled, rules=None):
+    """
+    Validate several manifests with one compiled schema, in a process pool when
+    -workers is above 1, and print the report of each manifest in input order
+    followed by a combined summary. With -report_dir, one report per manifest and
+    summary.json are written to that directory.
+    """
+    engine = getattr(args, "engine", "columnar")
+    workers = getattr(args, "workers", 1) or 1
+    report_dir = getattr(args, "report_dir", None)
+    fmt = getattr(args, "report_format", None) or "json"
+    report_files = batch_report_files(manifest_files, report_dir, fmt) if report_dir else [None] * len(manifest_files)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    # Every manifest is validated in a single worker
+    options = {key: value for key, value in vars(args).items() if key not in ("func", "manifest_file", "report")}
+    options.update({"workers": 1, "report_format": fmt})
+
+    manifests = []
+
+    def collect(results):
+        for manifest_file, report_file, (output, summary) in zip(manifest_files, report_files, results):
+            print(f"==== {manifest_file} ====")
+            print(output, end="")
+            manifests.append({
+                "manifest_file": manifest_file,
+                "status": summary["status"],
+                "rows_with_errors": summary.get("rows_with_errors"),
+                "error_count": summary.get("error_count"),
+                "distinct_errors": summary.get("distinct_errors"),
+                "error": summary.get("error"),
+                "report": report_file if summary["status"] != "error" else None,
+            })
+
+    if workers > 1:
+        with start_pool(schema_json, engine, workers, compiled, rules) as executor:
+            collect(executor.map(validate_manifest_file, repeat(options), manifest_files, report_files))
+    else:
+        init_worker(schema_json, engine, compiled, rules)
+        collect(map(validate_manifest_file, repeat(options), manifest_files, report_files))
+
+    statuses = Counter(manifest["status"] for manifest in manifests)
+    print(f"====Batch Summary: {len(manifests)} manifests====")
+    for manifest in manifests:
+        rows = f" ({manifest['rows_with_errors']} rows with errors)" if manifest["rows_with_errors"] else ""
+        print(f"  {manifest['status']}: {manifest['manifest_file']}{rows}")
+    print("  " + ", ".join(f"{statuses[status]} {status}" for status in ["passed", "warnings", "failed", "error"] if statuses[status]))
+
+    if report_dir:
+        with open(os.path.join(report_dir, "summary.json"), "w") as f:
+            json.dump({"manifests": manifests, "statuses": dict(statuses)}, f, indent=2)
+    return manifests
+
+def validation_options(options=None):
+    """
+    Complete validation options, given by their command-line names, with their defaults.
+    """
+    options = dict(options or {})
+    unknown = sorted(set(options) - set(DEFAULT_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unknown validation options: {', '.join(unknown)}. Use {', '.join(DEFAULT_OPTIONS)}.")
+    return argparse.Namespace(**{**DEFAULT_OPTIONS, **options})
+
+def prepare_validation(args, schema=None):
+    """
+    Compile what manifests are validated against: the rules of the -rules file when
+    it is given, else the schema (a schema file or dict, the packaged schema by default).
+    Returns the schema, its compiled checks and the compiled rules.
+    """
+    engine = getattr(args, "engine", "columnar")
+    rules_file = getattr(args, "rules", None)
+    max_errors = getattr(args, "max_errors", None)
+    if max_errors is not None and max_errors <= 0:
+        raise ValueError(f"-max_errors must be above 0, got {max_errors}.")
+    chunksize = getattr(args, "chunksize", None)
+    if chunksize is not None and chunksize <= 0:
+        raise ValueError(f"-chunksize must be above 0, got {chunksize}.")
+    workers = getattr(args, "workers", 1)
+    if workers is not None and workers <= 0:
+        raise ValueError(f"-workers must be above 0, got {workers}.")
+    if rules_file:
+        if getattr(args, "incremental", None):
+            raise ValueError("-incremental is not supported with -rules.")
+        if engine != "columnar":
+            raise ValueError("-engine is not supported with -rules: rules are always evaluated column by column.")
+        return None, None, compile_rules(load_rules(rules_file, getattr(args, "rule_set", None) or DEFAULT_RULE_SET))
+    if isinstance(schema, dict):
+        return schema, compile_validators(schema, engine), None
+    schema_json, compiled = load_schema(schema or validation_schema, use_cache=not getattr(args, "no_cache", False))
+    if engine != "columnar":
+        compiled = compile_validators(schema_json, engine)
+    return schema_json, compiled, None
+
+def validate(manifest, schema=None, options=None):
+    """
+    Validate a manifest and return a ValidationResult, without printing.
+    manifest is a manifest file, a DataFrame (its data isn't copied when its
+    columns already hold strings) or an Arrow table; schema is a validation schema
+    file or dict, the packaged schema by default; options are the command-line
+    options by name, e.g. {"workers": 4, "cross_row": True, "max_errors": 100}.
+    """
+    args = validation_options(options)
+    schema_json, compiled, rules = prepare_validation(args, schema)
+    if args.workers > 1:
+        with start_pool(schema_json, args.engine, args.workers, compiled, rules) as executor:
+            return validate_manifest(manifest, args, schema_json, compiled, executor, rules)
+    return validate_manifest(manifest, args, schema_json, compiled, rules=rules)
+
+def main(args):
+    """
+    Main function to load schema, validate data, and print the validation report.
+    Several manifests, directories or glob patterns are validated as a batch.
+    """
+    engine = getattr(args, "engine", "columnar")
+    workers = getattr(args, "workers", 1) or 1
+
+    paths = [args.manifest_file] if isinstance(args.manifest_file, str) else list(args.manifest_file)
+    manifest_files = expand_manifest_files(paths)
+    if not manifest_files:
+        raise ValueError(f"No manifest files found in {', '.join(paths)}.")
+    batch = manifest_files != paths or len(manifest_files) > 1
+    if batch:
+        if getattr(args, "incremental", None):
+            raise ValueError("-incremental is not supported with several manifests.")
+        if getattr(args, "report", None):
+            raise ValueError("Use -report_dir to write the reports of several manifests.")
+    else:
+        args.manifest_file = manifest_files[0]
+
+    schema_json, compiled, rules = prepare_validation(args)
+
+    if batch:
+        run_batch(args, manifest_files, schema_json, compiled, rules)
+    elif workers > 1:
+        with start_pool(schema_json, engine, workers, compiled, rules) as executor:
+            run_validation(args, schema_json, compiled, executor, rules)
+    else:
+        run_validation(args, schema_json, compiled, rules=rules)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Validate a manifest based on defined rules.")
-    parser.add_argument("-manifest_file", required=True, help="Path to the manifest file (CSV/Excel).")
+    parser.add_argument("-manifest_file", nargs="+", required=True, help="Manifest files (CSV/TSV/Excel/Parquet/Feather), directories or glob patterns.")
+    parser.add_argument("-engine", choices=["columnar", "cerberus"], default="columnar", help="Validation engine. Default: columnar")
+    parser.add_argument("-chunksize", type=positive_int, default=None, help="Validate the manifest in chunks of this many rows.")
+    parser.add_argument("-csv_reader", choices=["auto", "pandas", "arrow"], default="auto", help="CSV/TSV parser. Default: auto")
+    parser.add_argument("-workers", type=positive_int, default=1, help="Number of worker processes. Default: 1")
+    parser.add_argument("-no_cache", action="store_true", help="Don't use the on-disk compiled schema cache.")
+    parser.add_argument("-incremental", default=None, help="State file to only re-validate new or changed rows.")
+    parser.add_argument("-report", default=None, help="Write a machine-readable validation report to this file.")
+    parser.add_argument("-report_dir", default=None, help="Directory for the reports of a batch of manifests and their summary.json.")
+    parser.add_argument("-report_format", choices=REPORT_FORMATS, default=None, help="Report format. Default: from the report file extension")
+    parser.add_argument("-summary", action="store_true", help="Print one line per distinct error instead of every row error.")
+    parser.add_argument("-fail_fast", action="store_true", help="Stop at the first row with errors.")
+    parser.add_argument("-max_errors", type=int, default=None, help="Stop once this many rows have errors.")
+    parser.add_argument("-cross_row", action="store_true", help="Also check duplicate file names and hashes, and paired-end FASTQ mates.")
+    parser.add_argument("-rules", default=None, help="Condition/consequence rules file to evaluate instead of the schema.")
+    parser.add_argument("-rule_set", default=DEFAULT_RULE_SET, help=f"Rule list of the rules file. Default: {DEFAULT_RULE_SET}")
     args = parser.parse_args()
     main(args)
\ No newline at end of file
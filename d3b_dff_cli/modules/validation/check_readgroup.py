@@ -1,42 +1,218 @@
 #!/usr/bin/env python
 import os
 import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 import pysam
+from ...cli import positive_int
+from .bam_header import has_rg, read_header, read_header_from, reads_have_rg
+from .remote_file import POOL_SIZE, aws_credentials, bytes_fetched, get_session, is_remote, open_file, remote_path
 
-def check_rg(file_path):
-    """Check if the BAM header contains an RG line."""
+
+def read_header_text(file_path):
+    """
+    Read the file format and the header text of a BAM or CRAM file.
+    Only the header is decompressed; files that can't be parsed that way are opened with pysam.
+    """
+    try:
+        return read_header(file_path)
+    except ValueError:
+        file_format = "cram" if file_path.lower().endswith(".cram") else "bam"
+        with pysam.AlignmentFile(file_path, "rc" if file_format == "cram" else "rb") as bam:
+            return file_format, str(bam.header)
+
+
+def header_has_rg(file_path):
+    """
+    Whether the header of a BAM or CRAM file has @RG lines, and the file format.
+    """
+    file_format, header_text = read_header_text(file_path)
+    return has_rg(header_text), file_format
+
+
+def check_rg(file_path, threads=1, reference=None):
+    """
+    Check if the BAM or CRAM header contains an RG line, else if its first 5k reads have an RG tag.
+    threads BGZF decompression threads are used by pysam to read alignments; the
+    alignments of a CRAM file are only read with its reference.
+    Files in object storage are read with range requests: only the blocks of the
+    header, and of the first reads of a BAM file without @RG lines, are fetched.
+    Returns the error message, or None.
+    """
+    no_reads_rg = f"Error: No @RG found in the header or the first 5k reads of {file_path}."
+    try:
+        if is_remote(file_path):
+            with open_file(file_path) as f:
+                file_format, header_text, stream = read_header_from(f)
+                if has_rg(header_text):
+                    return None
+                if stream is not None:
+                    return None if reads_have_rg(stream) else no_reads_rg
+        else:
+            header_rg, file_format = header_has_rg(file_path)
+            if header_rg:
+                return None
+        if file_format == "cram" and not reference:
+            return f"Error: No @RG found in the header of {file_path}; use -reference to check its first 5k reads."
+        mode = "rc" if file_format == "cram" else "rb"
+        # htslib looks for the index of a CRAM file, which isn't needed to read the first reads
+        verbosity = pysam.set_verbosity(0) if file_format == "cram" else None
+        try:
+            with pysam.AlignmentFile(file_path, mode, threads=threads, reference_filename=reference) as bam:
+                # search first 5k reads for an RG tag
+                if not any(read.has_tag("RG") for read in bam.head(5000)):
+                    return no_reads_rg
+        finally:
+            if verbosity is not None:
+                pysam.set_verbosity(verbosity)
+    except Exception as e:
+        return f"Error processing {file_path}: {e}"
+    return None
+
+
+def file_name(path):
+    """
+    Path of a local file, or of a URL without its query string.
+    """
+    return remote_path(path) if is_remote(path) else path
+
+
+def audit_rg(file_path, threads=1, reference=None, stride=1):
+    """
+    Stream every alignment of a BAM or CRAM file, or every stride-th one, and count
+    the reads of each RG ID. Reads without an RG tag, or whose RG ID isn't declared
+    in the header, are errors. Only the counts are kept in memory.
+    Returns the report lines: the counts, then the errors and warnings.
+    """
+    counts = Counter()
+    missing = 0
+    cram = file_name(file_path).lower().endswith(".cram")
+    if cram and not reference:
+        return [f"Error: {file_path} is a CRAM file; use -reference to audit its reads."]
+    verbosity = pysam.set_verbosity(0) if cram else None
     try:
-        bam = pysam.AlignmentFile(file_path, "rb")
-        header = bam.header.to_dict()
-        if not "RG" in header:
-            # search first 5k lines, and see if any start with @RG
-            sample_lines = bam.head(5000)
-            if not any("RG:" in line.to_string() for line in sample_lines):
-                print(
-                    f"Error: No @RG found in the header or the first 5k reads of {file_path}."
-                )
+        with pysam.AlignmentFile(file_path, "rc" if cram else "rb", threads=threads, reference_filename=reference) as bam:
+            declared = [read_group["ID"] for read_group in bam.header.to_dict().get("RG", [])]
+            reads = bam.fetch(until_eof=True)
+            if stride > 1:
+                reads = islice(reads, 0, None, stride)
+            for read in reads:
+                try:
+                    counts[read.get_tag("RG")] += 1
+                except KeyError:
+                    missing += 1
     except Exception as e:
-        print(f"Error processing {file_path}: {e}")
+        return [f"Error processing {file_path}: {e}"]
+    finally:
+        if verbosity is not None:
+            pysam.set_verbosity(verbosity)
+
+    total = sum(counts.values()) + missing
+    reads = "sampled reads" if stride > 1 else "reads"
+    lines = [
+        f"{file_path}: {total} {reads}" + (f" (1 in {stride})" if stride > 1 else "")
+        + "".join(f", {rg_id}: {count}" for rg_id, count in sorted(counts.items()))
+    ]
+    if missing:
+        lines.append(f"Error: {missing} of {total} {reads} of {file_path} have no RG tag.")
+    undeclared = sorted(rg_id for rg_id in counts if rg_id not in declared)
+    if undeclared:
+        shown = ", ".join(undeclared[:10]) + (", ..." if len(undeclared) > 10 else "")
+        lines.append(
+            f"Error: {sum(counts[rg_id] for rg_id in undeclared)} {reads} of {file_path} "
+            f"have an RG ID not declared in the header: {shown}."
+        )
+    if stride == 1:
+        # A sample can miss small read groups
+        for rg_id in declared:
+            if not counts[rg_id]:
+                lines.append(f"[Warning] @RG {rg_id} of {file_path} has no reads.")
+    return lines
+
+
+def check_file(bam_file, threads=1, reference=None, deep=False, stride=1):
+    """
+    Check one BAM or CRAM file, or audit all its reads when deep is True.
+    Returns the message to print, or None when it has @RG information.
+    """
+    # Check if bam or cram format
+    if not file_name(bam_file).lower().endswith((".bam", ".cram")):
+        return f"Error: Bam file {bam_file} must end with '.bam' or '.cram'"
+    if not is_remote(bam_file) and not os.path.exists(bam_file):
+        return f"File not found: {bam_file}"
+    if deep:
+        return "\n".join(audit_rg(bam_file, threads, reference, stride))
+    return check_rg(bam_file, threads, reference)
+
+
+def iter_checks(bam_files, workers=1, threads=1, reference=None, deep=False, stride=1):
+    """
+    Check BAM/CRAM files, in a pool of worker processes when workers is above 1, and
+    yield the message of every file in input order as soon as it is available.
+    Files in object storage are checked from a pool of threads sharing the connections of one session.
+    """
+    check = partial(check_file, threads=threads, reference=reference, deep=deep, stride=stride)
+    if workers > 1 and any(is_remote(bam_file) for bam_file in bam_files):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(check, bam_files)
+    elif workers > 1:
+        # Batch the files sent to workers: header checks take milliseconds, audits take minutes
+        chunksize = 1 if deep else max(1, len(bam_files) // (workers * 16))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(check, bam_files, chunksize=chunksize)
+    else:
+        for bam_file in bam_files:
+            yield check(bam_file)
+
+
+def print_throughput(bam_files, seconds):
+    """
+    Print the number of files and megabytes checked per second, and the
+    megabytes fetched from object storage.
+    """
+    megabytes = sum(os.path.getsize(bam_file) for bam_file in bam_files if os.path.isfile(bam_file)) / 1e6
+    seconds = max(seconds, 1e-9)
+    fetched = f", {bytes_fetched() / 1e6:.2f} MB fetched" if any(is_remote(bam_file) for bam_file in bam_files) else ""
+    print(
+        f"Checked {len(bam_files)} files ({megabytes:.1f} MB) in {seconds:.2f}s: "
+        f"{len(bam_files) / seconds:.1f} files/s, {megabytes / seconds:.1f} MB/s{fetched}",
+        file=sys.stderr,
+    )
 
 
 def main(args):
-    for bam_file in args.bam_files:
-        # Check if bam format
-        if not bam_file.endswith((".bam", ".BAM")):
-            print(f"Error: Bam file {bam_file} must end with '.bam' or '.BAM'")
-            continue
-
-        if not os.path.exists(bam_file):
-            print(f"File not found: {bam_file}")
-        else:
-            #deprecated_check_rg(bam_file)
-            check_rg(bam_file)
+    workers = getattr(args, "workers", 1) or 1
+    threads = getattr(args, "threads", 1) or 1
+    reference = getattr(args, "reference", None)
+    deep = getattr(args, "deep", False)
+    stride = getattr(args, "stride", 1) or 1
+    bam_files = list(args.bam_files)
+    if any(is_remote(bam_file) for bam_file in bam_files):
+        # One connection per worker thread
+        get_session(max(workers, POOL_SIZE))
+    if any(bam_file.lower().startswith("s3://") for bam_file in bam_files):
+        # Fail before checking any file when s3:// URLs can't be signed
+        aws_credentials()
+    start = time.perf_counter()
+    for message in iter_checks(bam_files, workers, threads, reference, deep, stride):
+        if message:
+            print(message, flush=True)
+    print_throughput(bam_files, time.perf_counter() - start)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Check the presence of @RG information in the header or the first 5k reads of BAM files."
+        description="Check the presence of @RG information in the header or the first 5k reads of BAM/CRAM files, or audit all their reads."
     )
-    parser.add_argument("bam_files", nargs="+", help="One or more BAM files to check.")
+    parser.add_argument("bam_files", nargs="+", help="One or more BAM/CRAM files, or their http(s):// or s3:// URLs, to check. s3:// URLs need AWS credentials.")
+    parser.add_argument("-workers", type=positive_int, default=1, help="Number of worker processes (threads for URLs) checking files in parallel. Default: 1")
+    parser.add_argument("-threads", type=positive_int, default=1, help="BGZF decompression threads per file. Default: 1")
+    parser.add_argument("-reference", default=None, help="Reference FASTA to read CRAM alignments. Default: None")
+    parser.add_argument("-deep", action="store_true", help="Audit every read: count reads per RG ID and report reads with a missing or undeclared RG.")
+    parser.add_argument("-stride", type=positive_int, default=1, help="With -deep, audit every N-th read only. Default: 1")
     args = parser.parse_args()
     main(args)
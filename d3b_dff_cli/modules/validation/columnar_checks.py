@@ -0,0 +1,285 @@
+"""
+Columnar validation engine.
+
+Compiles the rule sets of the validation schema into vectorized checks that
+evaluate one manifest column at a time, instead of running a Cerberus
+validator per row. Values are matched case-insensitively, like CustomValidator. The per-row error report is the same as the one
+produced by ``CustomValidator``, which stays available as the reference engine.
+"""
+import re
+import numpy as np
+import pandas as pd
+from .case_folding import casefold, fold_values
+from .cerberus_custom_checks import CustomValidator
+from .custom_checks import compile_custom_checks
+
+TYPES_MAPPING = CustomValidator.types_mapping
+
+# Rules handled by the columnar engine, in addition to 'type' and 'nullable'
+VALUE_RULES = ("allowed", "dependencies", "regex", "min", "max")
+IGNORED_RULES = ("required", "meta")
+
+NULLABLE_MESSAGE = "null value not allowed"
+
+
+def _compile_field(field, definition):
+    """
+    Compile the Cerberus definition of one field into an ordered check plan.
+    """
+    for rule in definition:
+        if rule not in VALUE_RULES + IGNORED_RULES + ("type", "nullable"):
+            raise ValueError(f"Unsupported rule '{rule}' for field '{field}' in columnar engine")
+
+    # Dependencies gate the field: CustomValidator only validates fields whose
+    # dependencies are met. Values are case-folded once, here.
+    gate = []
+    for dependency_field, allowed_values in definition.get("dependencies", {}).items():
+        if not isinstance(allowed_values, list):
+            allowed_values = [allowed_values]
+        gate.append((dependency_field, fold_values(allowed_values)))
+
+    type_constraint = definition.get("type")
+    types = None
+    if type_constraint:
+        names = [type_constraint] if isinstance(type_constraint, str) else type_constraint
+        types = [TYPES_MAPPING[name] for name in names]
+
+    # Same order as Cerberus: priority rules first, then definition order
+    rules = []
+    for rule in definition:
+        if rule == "allowed":
+            rules.append(("allowed", fold_values(definition[rule]), None))
+        elif rule == "dependencies":
+            rules.append(("dependencies", gate, f"depends on these values: {definition[rule]}"))
+        elif rule == "regex":
+            pattern = definition[rule]
+            anchored = pattern if pattern.endswith("$") else pattern + "$"
+            rules.append(("regex", re.compile(anchored, re.IGNORECASE), f"value does not match regex '{pattern}'"))
+        elif rule in ("min", "max"):
+            rules.append((rule, definition[rule], f"{rule} value is {definition[rule]}"))
+
+    return {
+        "field": field,
+        "gate": gate,
+        "nullable": definition.get("nullable", False),
+        "types": types,
+        "type_message": f"must be of {type_constraint} type" if types else None,
+        "rules": rules,
+    }
+
+
+def compile_schema(schema_json):
+    """
+    Compile every rule set of the schema into columnar check plans.
+    """
+    compiled = {"custom_rules": compile_custom_checks(schema_json.get("custom_rules", {}))}
+    for rule_type, schema in schema_json.items():
+        if rule_type == "custom_rules":
+            continue
+        compiled[rule_type] = [_compile_field(field, definition) for field, definition in schema.items()]
+    return compiled
+
+
+class _Column:
+    """
+    The values of one manifest column as seen by a row-wise validator.
+    """
+
+    UNIFORM_TYPES = {"b": bool, "i": int, "u": int, "f": float}
+
+    def __init__(self, series=None, length=0):
+        self.folded = None
+        if series is None:
+            # Column not in the manifest: every row sees None
+            self.values = np.full(length, None, dtype=object)
+            self.uniform_type = type(None)
+            self.types = None
+            return
+
+        kind = series.dtype.kind
+        if kind in self.UNIFORM_TYPES:
+            self.values = series.to_numpy()
+            self.uniform_type = self.UNIFORM_TYPES[kind]
+            self.types = None
+            return
+
+        self.values = series.to_numpy(dtype=object)
+        if pd.api.types.infer_dtype(self.values, skipna=False) == "string":
+            self.uniform_type = str
+            self.types = None
+        else:
+            self.uniform_type = None
+            self.types = np.frompyfunc(type, 1, 1)(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def type_mask(self, predicate):
+        """
+        Boolean mask of the values whose Python type satisfies ``predicate``.
+        """
+        if self.uniform_type is not None:
+            return np.full(len(self), bool(predicate(self.uniform_type)))
+        mask = np.zeros(len(self), dtype=bool)
+        for value_type in pd.unique(self.types):
+            if predicate(value_type):
+                mask |= self.types == value_type
+        return mask
+
+    def none_mask(self):
+        return self.type_mask(lambda t: t is type(None))
+
+    def str_mask(self):
+        return self.type_mask(lambda t: issubclass(t, str))
+
+    def isin(self, allowed_values):
+        """
+        Elementwise ``value in allowed_values`` with Python equality, ignoring the
+        case of strings; ``allowed_values`` must be case-folded. Strings are folded
+        once per distinct value, without keeping a folded copy of the column.
+        """
+        if self.uniform_type is type(None):
+            return np.full(len(self), None in allowed_values)
+        if self.uniform_type in (bool, int, float):
+            return pd.Series(self.values, copy=False).isin(allowed_values).to_numpy()
+        if self.folded is None:
+            codes, uniques = pd.factorize(self.values, use_na_sentinel=False)
+            self.folded = (codes, pd.Index([casefold(value) for value in uniques], dtype=object))
+        codes, folded = self.folded
+        return folded.isin(allowed_values)[codes]
+
+    def masked(self, mask):
+        """
+        Values as a row-wise validator would see them, or None where ``mask`` is False.
+        """
+        values = self.values.astype(object)
+        values[~mask] = None
+        return values
+
+
+def _matches_type(value_type, type_definitions):
+    return any(
+        issubclass(value_type, definition.included_types)
+        and not issubclass(value_type, definition.excluded_types)
+        for definition in type_definitions
+    )
+
+
+def _compare_mask(column, alive, rule, limit):
+    """
+    Mask of values that violate a min/max rule; incomparable values pass.
+    """
+    mask = np.zeros(len(column), dtype=bool)
+    for position in np.flatnonzero(alive):
+        try:
+            value = column.values[position]
+            mask[position] = value < limit if rule == "min" else value > limit
+        except TypeError:
+            pass
+    return mask
+
+
+def _check_field(plan, column, present, filtered):
+    """
+    Evaluate the Cerberus rules of one field. Returns a list of
+    ``(rule, mask, message)`` tuples; ``message`` is a string or an object
+    array aligned with the rows.
+    """
+    results = []
+    none = column.none_mask()
+
+    if not plan["nullable"]:
+        results.append(("nullable", present & none, NULLABLE_MESSAGE))
+
+    # None values skip every remaining rule except dependencies
+    alive = present.copy()
+    has_value = present & ~none
+
+    if plan["types"]:
+        type_ok = column.type_mask(lambda t: _matches_type(t, plan["types"]))
+        type_error = has_value & ~type_ok
+        results.append(("type", type_error, plan["type_message"]))
+        alive &= ~type_error
+        has_value &= ~type_error
+
+    for rule, constraint, message in plan["rules"]:
+        if rule == "dependencies":
+            failed = np.zeros(len(column), dtype=bool)
+            for dependency_field, allowed_values in constraint:
+                failed |= ~filtered(dependency_field).isin(allowed_values)
+            failed &= alive
+            results.append((rule, failed, message))
+            # Cerberus stops processing a field after a dependencies error
+            alive &= ~failed
+            has_value &= ~failed
+        elif rule == "allowed":
+            unallowed = has_value & ~column.isin(constraint)
+            messages = np.full(len(column), None, dtype=object)
+            for position in np.flatnonzero(unallowed):
+                messages[position] = "unallowed value {value}".format(value=column.values[position])
+            results.append((rule, unallowed, messages))
+        elif rule == "regex":
+            strings = has_value & column.str_mask()
+            matched = np.zeros(len(column), dtype=bool)
+            if strings.any():
+                matched[strings] = [bool(constraint.match(value)) for value in column.values[strings]]
+            results.append((rule, strings & ~matched, message))
+        elif rule in ("min", "max"):
+            results.append((rule, _compare_mask(column, has_value, rule, constraint), message))
+
+    return results
+
+
+def validate_rule_set(df, plans, custom):
+    """
+    Validate all rows of ``df`` against one compiled rule set.
+    Returns a list with the error dict of every row (empty dict when valid).
+    """
+    n = len(df)
+    fields = [plan["field"] for plan in plans]
+    columns = {field: _Column(df[field] if field in df.columns else None, n) for field in fields}
+
+    def raw(field):
+        # The row document only holds fields of the rule set
+        return columns[field] if field in columns else _Column(None, n)
+
+    # Fields whose dependencies are met form the filtered document
+    present = {}
+    for plan in plans:
+        mask = np.ones(n, dtype=bool)
+        for dependency_field, allowed_values in plan["gate"]:
+            mask &= raw(dependency_field).isin(allowed_values)
+        present[plan["field"]] = mask
+
+    filtered_cache = {}
+
+    def filtered(field):
+        if field not in filtered_cache:
+            if field in present:
+                column = _Column(pd.Series(columns[field].masked(present[field]), dtype=object), n)
+            else:
+                column = _Column(None, n)
+            filtered_cache[field] = column
+        return filtered_cache[field]
+
+    # Collect (rule, mask, message) per field; the custom check has no rule name
+    checks = {}
+    for plan in plans:
+        field = plan["field"]
+        checks[field] = _check_field(plan, columns[field], present[field], filtered)
+
+    for plan in plans:
+        field = plan["field"]
+        for check, prepared in custom.get(field, ()):
+            mask, messages = check.check_column(prepared, columns[field], filtered)
+            checks[field].append(("", mask & present[field], messages))
+
+    # Cerberus keeps its error list sorted by field, then by rule name
+    row_errors = [dict() for _ in range(n)]
+    for field in sorted(checks):
+        for _, mask, message in sorted(checks[field], key=lambda check: check[0]):
+            for position in np.flatnonzero(mask):
+                text = message if isinstance(message, str) else message[position]
+                row_errors[position].setdefault(field, []).append(text)
+
+    return row_errors
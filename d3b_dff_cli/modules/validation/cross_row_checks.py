@@ -0,0 +1,300 @@
+"""
+Cross-row manifest checks: duplicate file names, duplicate file hashes and
+paired-end FASTQ mates.
+
+Every check keys the rows of a chunk, finds the first row of every key within
+the chunk with pandas, and looks the new keys up in an index of the keys seen in
+previous chunks. The indexes are sqlite tables, in memory or, for streamed
+manifests, in a temporary database file that spills to disk, so only one chunk
+of the manifest is held in memory.
+
+Duplicates and metadata mismatches are reported on the later row, so chunks can
+be reported as soon as they are checked, with the earlier row they relate to
+under "related". Mates missing their pair are only known once every row is seen
+and are reported by finish(); streamed rows with errors whose mate isn't seen
+yet are held back until then, so every row is reported once.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from collections import deque
+import pandas as pd
+from .report import has_errors
+
+# Fields whose values must be unique in a manifest
+DUPLICATE_FIELDS = ["file_name", "file_hash_value"]
+
+# Fields both mates of a read pair must agree on
+PAIR_FIELDS = ["sample_id", "aliquot_id", "flow_cell_barcode", "lane_number"]
+
+# Read number in a file name, such as _R1_, _R2. or .1.
+READ_NUMBER = re.compile(r"(?<=[._-])r?([12])(?=[._-])")
+
+READ_PAIR_NUMBERS = {"r1": 1, "1": 1, "r2": 2, "2": 2}
+
+
+def text_column(df, column):
+    """
+    Values of a column as stripped strings, with "" for missing values.
+    Strings are converted once per distinct value.
+    """
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    values = df[column]
+    if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+        # Integers of a column with missing values are read as floats
+        values = values.astype("Int64")
+    codes, uniques = pd.factorize(values.to_numpy(dtype=object), use_na_sentinel=False)
+    uniques = pd.Index(uniques, dtype=object)
+    strings = uniques.where(uniques.notna(), "").astype(str).str.strip()
+    strings = strings.where(strings.str.lower() != "nan", "")
+    return pd.Series(strings.to_numpy()[codes], index=df.index, dtype=object)
+
+
+def pair_key(file_name, mate, metadata):
+    """
+    Key shared by both mates of a read pair: the file name with its read number
+    masked, or the pair metadata when the file name has no read number matching
+    read_pair_number.
+    """
+    matches = [match for match in READ_NUMBER.finditer(file_name) if int(match.group(1)) == mate]
+    if not matches:
+        return "\t" + "\t".join(metadata)
+    last = matches[-1]
+    return file_name[:last.start(1)] + "*" + file_name[last.end(1):]
+
+
+def mate_rows(df, rows):
+    """
+    Paired-end FASTQ rows of df with their pair key, mate number and pair metadata.
+    """
+    file_format = text_column(df, "file_format").str.lower()
+    paired = text_column(df, "is_paired_end").str.lower().isin(["true", "1", "1.0"])
+    mate = text_column(df, "read_pair_number").str.lower().map(READ_PAIR_NUMBERS)
+    selected = ((file_format == "fastq") & paired & mate.notna()).to_numpy()
+    df = df[selected]
+
+    mates = pd.DataFrame({field: text_column(df, field) for field in PAIR_FIELDS})
+    mates.insert(0, "row", rows[selected])
+    mates.insert(1, "mate", mate[selected].astype(int))
+    file_names = text_column(df, "file_name").str.lower()
+    mates.insert(1, "pair", [
+        pair_key(file_name, mate, metadata)
+        for file_name, mate, metadata in zip(file_names, mates["mate"], mates[PAIR_FIELDS].itertuples(index=False))
+    ])
+    return mates.reset_index(drop=True)
+
+
+def add_error(row_errors, row, field, message, related=None):
+    """
+    Add a message to the errors of a row, once, with the details of the row it
+    relates to, such as {"row": 3} for a duplicate of row 3.
+    """
+    error = row_errors.setdefault(row, {'row': row, 'errors': {}})
+    field_errors = error['errors'].setdefault(field, [])
+    if message not in field_errors:
+        field_errors.append(message)
+    if related is not None:
+        error.setdefault('related', {})[field] = related
+
+
+def sorted_errors(row_errors):
+    return [row_errors[row] for row in sorted(row_errors)]
+
+
+def merge_errors(errors, other):
+    """
+    Merge two error lists into one sorted by row, combining the errors of rows in both.
+    """
+    row_errors = {}
+    for error in list(errors) + list(other):
+        related = error.get('related', {})
+        for field, messages in error['errors'].items():
+            for message in messages:
+                add_error(row_errors, int(error['row']), field, message, related.get(field))
+    return sorted_errors(row_errors)
+
+
+class CrossRowIndex:
+    """
+    Indexes of the file names, file hashes and read mates seen so far.
+    With spill=True the indexes are kept in a temporary database file instead of memory.
+    """
+
+    def __init__(self, spill=False):
+        self.tmp_dir = tempfile.mkdtemp(prefix="d3b-cross-row-") if spill else None
+        self.chunks = 0
+        self.db = sqlite3.connect(os.path.join(self.tmp_dir, "index.db") if spill else ":memory:")
+        self.db.executescript(f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE seen (field TEXT, key TEXT, row INTEGER, PRIMARY KEY (field, key)) WITHOUT ROWID;
+            CREATE TABLE mates (pair TEXT, mate INTEGER, row INTEGER, {', '.join(f'{field} TEXT' for field in PAIR_FIELDS)},
+                                PRIMARY KEY (pair, mate)) WITHOUT ROWID;
+            CREATE INDEX mates_row ON mates (row);
+            CREATE TEMP TABLE batch (key TEXT, row INTEGER);
+        """)
+
+    def close(self):
+        self.db.close()
+        if self.tmp_dir:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def seen_rows(self, field, firsts, last=False):
+        """
+        Look up the keys of firsts (first row of every key of the chunk) in the
+        index of field, add the new ones, and return the first row of every key overall.
+        """
+        if last and not self.chunks:
+            # Whole manifest: nothing to look up or to keep
+            return firsts
+        self.db.executemany("INSERT INTO batch VALUES (?, ?)", zip(firsts.index, firsts.tolist()))
+        earlier = dict(self.db.execute(
+            "SELECT batch.key, seen.row FROM batch JOIN seen ON seen.field = ? AND seen.key = batch.key", (field,)
+        ))
+        self.db.execute("INSERT OR IGNORE INTO seen SELECT ?, key, row FROM batch", (field,))
+        self.db.execute("DELETE FROM batch")
+        if earlier:
+            firsts = firsts.copy()
+            found = firsts.index.isin(list(earlier))
+            firsts[found] = firsts.index[found].map(earlier)
+        return firsts
+
+    def check_duplicates(self, df, rows, row_errors, last=False):
+        for field in DUPLICATE_FIELDS:
+            if field not in df.columns:
+                continue
+            values = text_column(df, field)
+            if field == "file_hash_value":
+                # The same value of different hash types is not a duplicate
+                values = text_column(df, "file_hash_type").str.lower() + ":" + values.str.lower()
+            key = pd.Series(values.to_numpy(), index=rows)[(values != "").to_numpy()]
+            duplicated = key.duplicated()
+            if last and not self.chunks and not duplicated.any():
+                continue
+            firsts = pd.Series(key.index[~duplicated], index=key[~duplicated].to_numpy())
+            first_rows = key.map(self.seen_rows(field, firsts, last))
+            for row, first in first_rows[first_rows.index != first_rows.to_numpy()].items():
+                add_error(row_errors, row, field, "duplicate value of an earlier row", {"row": int(first)})
+
+    def check_mates(self, df, rows, row_errors):
+        mates = mate_rows(df, rows)
+        if mates.empty:
+            return
+        columns = ["pair", "mate", "row"] + PAIR_FIELDS
+        self.db.executemany("INSERT INTO batch (key) VALUES (?)", ((pair,) for pair in mates["pair"].unique()))
+        earlier = pd.DataFrame(self.db.execute(
+            f"SELECT {', '.join('mates.' + column for column in columns)} FROM mates JOIN batch ON mates.pair = batch.key"
+        ).fetchall(), columns=columns)
+        self.db.execute("DELETE FROM batch")
+
+        # First row of every (pair, mate), from an earlier chunk if there is one
+        known = pd.concat([earlier, mates], ignore_index=True) if not earlier.empty else mates
+        firsts = known.drop_duplicates(["pair", "mate"])
+        self.db.executemany(
+            f"INSERT OR IGNORE INTO mates VALUES ({', '.join('?' * len(columns))})",
+            firsts[columns].astype({"mate": int, "row": int}).itertuples(index=False)
+        )
+
+        first_row = mates.merge(firsts[["pair", "mate", "row"]], on=["pair", "mate"], suffixes=("", "_first"))
+        for row, mate, first in first_row.loc[first_row["row"] != first_row["row_first"], ["row", "mate", "row_first"]].itertuples(index=False):
+            add_error(row_errors, row, "read_pair_number", f"duplicate R{mate} file of the read pair", {"row": int(first)})
+
+        # Compare each mate with the first row of the other mate, when that row comes first
+        other = firsts.assign(mate=3 - firsts["mate"])
+        paired = mates.merge(other, on=["pair", "mate"], suffixes=("", "_mate"))
+        paired = paired[paired["row_mate"] < paired["row"]]
+        for field in PAIR_FIELDS:
+            for row, value, mate_row in paired.loc[paired[field] != paired[f"{field}_mate"], ["row", f"{field}_mate", "row_mate"]].itertuples(index=False):
+                add_error(row_errors, row, field, "differs from its mate", {"row": int(mate_row), "value": value})
+
+    def check(self, df, last=False):
+        """
+        Check a chunk of the manifest against itself and the previous chunks.
+        last tells that no chunk follows, so its file names and hashes are not indexed.
+        Returns the errors of its rows, like validate_data.
+        """
+        rows = df.index.to_numpy() + 1
+        row_errors = {}
+        self.check_duplicates(df, rows, row_errors, last)
+        self.check_mates(df, rows, row_errors)
+        self.chunks += 1
+        return sorted_errors({int(row): {**error, 'row': int(row)} for row, error in row_errors.items()})
+
+    def unpaired(self, rows):
+        """
+        The rows among rows that are mates whose pair is not seen so far.
+        """
+        self.db.executemany("INSERT INTO batch (row) VALUES (?)", ((int(row),) for row in rows))
+        found = {row for row, in self.db.execute(
+            "SELECT mates.row FROM batch JOIN mates ON mates.row = batch.row "
+            "WHERE (SELECT count(*) FROM mates AS other WHERE other.pair = mates.pair) = 1"
+        )}
+        self.db.execute("DELETE FROM batch")
+        return found
+
+    def finish(self):
+        """
+        Errors of the mates whose pair was not found in the manifest.
+        """
+        row_errors = {}
+        orphans = self.db.execute("SELECT min(mate), min(row) FROM mates GROUP BY pair HAVING count(*) = 1")
+        for mate, row in orphans:
+            add_error(row_errors, row, "read_pair_number", f"no R{3 - mate} mate found for this R{mate} file")
+        return sorted_errors(row_errors)
+
+
+def check_cross_rows(df):
+    """
+    Run every cross-row check on a whole manifest DataFrame.
+    Returns (valid, errors) like validate_data.
+    """
+    with CrossRowIndex() as index:
+        errors = merge_errors(index.check(df, last=True), index.finish())
+    return not errors, errors
+
+
+def iter_cross_rows(chunks, validate_chunks, spill=True, max_errors=None):
+    """
+    Run the cross-row checks on every chunk of a streamed manifest, merging their
+    errors with the (valid, errors) results that validate_chunks yields for the
+    same chunks. The errors of unpaired mates are yielded last, with the other
+    errors of their rows, which are held back until their mate is found: held
+    rows are yielded after rows that follow them.
+    With max_errors, once that many rows have errors (counting held rows), the
+    held rows and the rows up to the last of them are yielded and no chunk follows.
+    """
+    with CrossRowIndex(spill=spill) as index:
+        pending = deque()
+        held = {}
+        failed = 0
+
+        def checked():
+            for chunk in chunks:
+                pending.append(index.check(chunk))
+                yield chunk
+
+        for valid, errors in validate_chunks(checked()):
+            cross_errors = pending.popleft()
+            errors = merge_errors(errors, cross_errors)
+            if max_errors is not None:
+                for error in errors:
+                    failed += has_errors(error)
+                    if failed >= max_errors:
+                        last_row = error['row']
+                        yield False, merge_errors(held.values(), [error for error in errors if error['row'] <= last_row])
+                        return
+            unpaired = index.unpaired([error['row'] for error in errors] + list(held))
+            paired = [held.pop(row) for row in list(held) if row not in unpaired]
+            held.update((error['row'], error) for error in errors if error['row'] in unpaired)
+            yield valid and not cross_errors, merge_errors([error for error in errors if error['row'] not in unpaired], paired)
+        orphans = merge_errors(held.values(), index.finish())
+        yield not orphans, orphans
@@ -0,0 +1,152 @@
+"""
+Registry of the custom checks referenced from custom_rules in the validation schema.
+
+Custom checks validate a field beyond the Cerberus rules. Every entry of
+custom_rules names a registered check, and its value holds the check's
+parameters; entries starting with "_" are comments. A check has:
+    - prepare(rule): precompute the lookups of its custom_rules entry, once per schema
+    - check_value(prepared, value, document): row-level check used by
+      CustomValidator, returning an error message or None
+    - check_column(prepared, column, filtered): whole-column check used by the
+      columnar engine, returning a mask of the failing rows and their messages.
+      column holds the values of the field and filtered(field) the values of
+      another field of the filtered document.
+"""
+import numpy as np
+import pandas as pd
+from .case_folding import casefold, fold_values
+
+# experiment_strategy values that use the WGS/WXS byte cutoff
+WGS_WXS_STRATEGIES = ["wgs", "wxs", "wes"]
+
+CUSTOM_CHECKS = {}
+
+
+class CustomCheck:
+    """
+    A custom check of one field, with row-level and whole-column implementations.
+    """
+
+    def __init__(self, name, field, prepare, check_value, check_column):
+        self.name = name
+        self.field = field
+        self.prepare = prepare
+        self.check_value = check_value
+        self.check_column = check_column
+
+
+def register_check(name, field, prepare, check_value, check_column):
+    """
+    Register the custom check of field configured by the custom_rules entry called name.
+    """
+    CUSTOM_CHECKS[name] = CustomCheck(name, field, prepare, check_value, check_column)
+
+
+def compile_custom_checks(custom_rules):
+    """
+    Prepare the custom checks referenced from custom_rules.
+    Returns the list of (check, prepared rule) pairs of every field.
+    """
+    checks = {}
+    for name, rule in custom_rules.items():
+        if name.startswith("_"):
+            continue
+        if name not in CUSTOM_CHECKS:
+            raise ValueError(f"Unknown custom check '{name}', use one of {', '.join(CUSTOM_CHECKS)}.")
+        check = CUSTOM_CHECKS[name]
+        checks.setdefault(check.field, []).append((check, check.prepare(rule)))
+    return checks
+
+
+def prepare_file_name_extensions(rule):
+    """
+    Case-folded extension expected for each case-folded file_format.
+    """
+    return {
+        casefold(file_format): casefold(extension)
+        for file_format, extension in rule.items()
+        if extension and not file_format.startswith("_")
+    }
+
+
+def check_file_name_value(extensions, value, document):
+    """
+    file_name must end with the extension of its file_format, ignoring case.
+    """
+    file_format = document.get('file_format')
+    extension = extensions.get(file_format.casefold()) if isinstance(file_format, str) else None
+    if extension and isinstance(value, str) and not value.casefold().endswith(extension):
+        return f"file_name must end with {extension} for file_format '{file_format}'."
+    return None
+
+
+def check_file_name_column(extensions, column, filtered):
+    mask = np.zeros(len(column), dtype=bool)
+    messages = np.full(len(column), None, dtype=object)
+    strings = column.str_mask()
+    formats = filtered("file_format")
+    for file_format, extension in extensions.items():
+        rows = formats.isin([file_format]) & strings
+        if not rows.any():
+            continue
+        names = pd.Series(column.values[rows], dtype=object)
+        bad = ~names.str.casefold().str.endswith(extension).to_numpy(dtype=bool)
+        positions = np.flatnonzero(rows)[bad]
+        mask[positions] = True
+        for position in positions:
+            messages[position] = f"file_name must end with {extension} for file_format '{formats.values[position]}'."
+    return mask, messages
+
+
+def prepare_file_size_byte_cutoff(rule):
+    """
+    Byte cutoffs and the file formats they apply to.
+    """
+    return {
+        "general_cutoff": rule.get("general_cutoff"),
+        "wgs_wxs_cutoff": rule.get("wgs_wxs_cutoff"),
+        "file_formats": fold_values(rule.get("dependencies", {}).get("file_format", [])),
+    }
+
+
+def check_file_size_value(cutoffs, value, document):
+    """
+    file_size must reach the byte cutoff of its experiment.
+    """
+    file_format = document.get('file_format')
+    if casefold(file_format) not in cutoffs["file_formats"] or not isinstance(value, (int, float)):
+        return None
+    wgs_wxs = casefold(document.get("experiment_strategy")) in WGS_WXS_STRATEGIES
+    cutoff = cutoffs["wgs_wxs_cutoff"] if wgs_wxs else cutoffs["general_cutoff"]
+    if value < cutoff:
+        return f"[Warning] must be at least {cutoff} for file_format '{file_format}'."
+    return None
+
+
+def check_file_size_column(cutoffs, column, filtered):
+    mask = np.zeros(len(column), dtype=bool)
+    messages = np.full(len(column), None, dtype=object)
+    file_format = filtered("file_format").values
+    numeric = column.type_mask(lambda t: issubclass(t, (int, float)))
+    rows = numeric & filtered("file_format").isin(cutoffs["file_formats"])
+    if not rows.any():
+        return mask, messages
+
+    wgs_wxs = filtered("experiment_strategy").isin(WGS_WXS_STRATEGIES)
+    cutoff = np.where(wgs_wxs, cutoffs["wgs_wxs_cutoff"], cutoffs["general_cutoff"])
+    values = np.asarray(column.values[rows], dtype=float)
+    positions = np.flatnonzero(rows)[values < cutoff[rows]]
+    mask[positions] = True
+    for position in positions:
+        messages[position] = f"[Warning] must be at least {cutoff[position]} for file_format '{file_format[position]}'."
+    return mask, messages
+
+
+register_check(
+    "file_name_extensions", "file_name",
+    prepare_file_name_extensions, check_file_name_value, check_file_name_column,
+)
+register_check(
+    "file_size_byte_cutoff", "file_size",
+    prepare_file_size_byte_cutoff, check_file_size_value, check_file_size_column,
+)
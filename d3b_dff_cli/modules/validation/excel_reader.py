@@ -0,0 +1,203 @@
+"""
+Streaming reader for .xlsx manifests.
+
+The workbook is opened with openpyxl in read-only mode for its sheet list,
+shared strings and date styles, and the rows of the manifest sheet are parsed
+straight from the worksheet XML, or read with iter_rows when the openpyxl
+version doesn't have the internals this relies on. Rows are converted and typed
+the same way as pd.read_excel, without building a cell object for every value
+or loading the whole sheet.
+"""
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import from_excel, from_ISO8601
+from pandas.io.parsers import TextParser
+
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+ROW_TAG = f"{SHEET_NS}row"
+CELL_TAG = f"{SHEET_NS}c"
+VALUE_TAG = f"{SHEET_NS}v"
+INLINE_STRING_TAG = f"{SHEET_NS}is"
+TEXT_TAG = f"{SHEET_NS}t"
+RUN_TEXT_PATH = f"{SHEET_NS}r/{SHEET_NS}t"
+
+# Values of error cells, read as NaN like pd.read_excel does
+EXCEL_ERROR_CODES = set(ERROR_CODES)
+
+
+def select_sheet(sheet_names, manifest_file):
+    """
+    Select the Genomics_Manifest sheet, or the only sheet, of an Excel manifest.
+    """
+    if len(sheet_names) == 1:
+        return sheet_names[0]
+    elif "Genomics_Manifest" in sheet_names:
+        return "Genomics_Manifest"
+    else:
+        raise ValueError(f"Sheet 'Genomics_Manifest' not found in {manifest_file}")
+
+
+def excel_value(value):
+    """
+    Convert a cell value the way pd.read_excel does: empty cells to "", error
+    cells to NaN and integral numbers to int.
+    """
+    if value is None:
+        return ""
+    elif isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    elif isinstance(value, str) and value in EXCEL_ERROR_CODES:
+        return np.nan
+    return value
+
+
+def parse_cell(cell, sheet):
+    """
+    Value of a worksheet <c> element, as openpyxl reads it with data_only=True.
+    """
+    data_type = cell.get("t", "n")
+    if data_type == "inlineStr":
+        inline = cell.find(INLINE_STRING_TAG)
+        if inline is None:
+            return None
+        # Plain text and rich text runs, without phonetic hints
+        texts = [inline.findtext(TEXT_TAG)] + [run.text for run in inline.iterfind(RUN_TEXT_PATH)]
+        return "".join(text for text in texts if text is not None)
+
+    value = cell.findtext(VALUE_TAG) or None
+    if value is None:
+        return None
+    workbook = sheet.parent
+    if data_type == "n":
+        value = float(value) if any(c in value for c in ".eE") else int(value)
+        style = int(cell.get("s", 0))
+        if style in workbook._date_formats:
+            try:
+                value = from_excel(value, workbook.epoch, timedelta=style in workbook._timedelta_formats)
+            except (OverflowError, ValueError):
+                value = "#VALUE!"
+    elif data_type == "s":
+        value = sheet._shared_strings[int(value)]
+    elif data_type == "b":
+        value = bool(int(value))
+    elif data_type == "d":
+        value = from_ISO8601(value)
+    return value
+
+
+def can_parse_xml(sheet):
+    """
+    Whether the worksheet XML can be parsed directly: it relies on internals of
+    the openpyxl read-only workbook, which other versions may not have.
+    """
+    workbook = sheet.parent
+    return (
+        hasattr(workbook, "_archive")
+        and hasattr(workbook, "_date_formats")
+        and hasattr(workbook, "_timedelta_formats")
+        and hasattr(sheet, "_worksheet_path")
+        and hasattr(sheet, "_shared_strings")
+    )
+
+
+def iter_sheet_values(sheet):
+    """
+    Yield the values of every row of a read-only worksheet, filling missing rows
+    and cells with None like openpyxl's iter_rows(values_only=True). Falls back
+    to iter_rows when the worksheet XML can't be parsed directly.
+    """
+    if not can_parse_xml(sheet):
+        yield from (list(row) for row in sheet.iter_rows(values_only=True))
+        return
+    columns = {}
+    row_number = 0
+    with sheet.parent._archive.open(sheet._worksheet_path) as source:
+        for _, element in iterparse(source):
+            if element.tag != ROW_TAG:
+                continue
+            number = int(element.get("r", row_number + 1))
+            for _ in range(number - row_number - 1):
+                yield []
+            row_number = number
+
+            values = []
+            for cell in element.iterfind(CELL_TAG):
+                reference = cell.get("r")
+                if reference is not None:
+                    letters = reference.rstrip("0123456789")
+                    if letters not in columns:
+                        columns[letters] = column_index_from_string(letters)
+                    values.extend([None] * (columns[letters] - len(values) - 1))
+                values.append(parse_cell(cell, sheet))
+            # Cleared rows stay in the tree but hold no cells
+            element.clear()
+            yield values
+
+
+def iter_excel_rows(manifest_file):
+    """
+    Stream the rows of the Genomics_Manifest sheet, or the only sheet, of an .xlsx
+    manifest as lists of cell values, the header first. Trailing empty cells and
+    rows are dropped like pd.read_excel does.
+    """
+    workbook = openpyxl.load_workbook(manifest_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook[select_sheet(workbook.sheetnames, manifest_file)]
+        empty_rows = 0
+        for row in iter_sheet_values(sheet):
+            values = [excel_value(value) for value in row]
+            while values and values[-1] == "":
+                values.pop()
+            if not values:
+                # Only keep empty rows followed by data
+                empty_rows += 1
+                continue
+            for _ in range(empty_rows):
+                yield []
+            empty_rows = 0
+            yield values
+    finally:
+        workbook.close()
+
+
+def parse_excel_rows(header, rows, usecols=None):
+    """
+    Build a DataFrame from Excel rows with the same type inference as pd.read_excel.
+    """
+    if header is None:
+        return pd.DataFrame()
+    width = max([len(header)] + [len(row) for row in rows])
+    data = [row + [""] * (width - len(row)) for row in [header] + rows]
+    with TextParser(data, header=0, skip_blank_lines=False, usecols=usecols) as parser:
+        return parser.read()
+
+
+def read_excel_manifest(manifest_file, usecols=None):
+    """
+    Read the manifest sheet of an .xlsx file in one DataFrame.
+    """
+    rows = iter_excel_rows(manifest_file)
+    return parse_excel_rows(next(rows, None), list(rows), usecols)
+
+
+def iter_excel_manifest(manifest_file, chunksize, usecols=None):
+    """
+    Parse the manifest sheet of an .xlsx file in DataFrames of at most chunksize
+    rows, as they are read. The index of every chunk continues from the previous one.
+    """
+    rows = iter_excel_rows(manifest_file)
+    header = next(rows, None)
+    start = 0
+    while True:
+        chunk_rows = list(islice(rows, chunksize))
+        if not chunk_rows:
+            break
+        chunk = parse_excel_rows(header, chunk_rows, usecols)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
@@ -0,0 +1,120 @@
+"""
+Incremental manifest validation.
+
+Row validation only depends on the row's own values, so the result of every
+row is stored next to a hash of its relevant fields. On the next run, only
+rows whose hash is new are validated again; the other results are reused.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+STATE_VERSION = 1
+
+
+def relevant_fields(schema_json):
+    """
+    Fields that can affect the validation result of a row.
+    """
+    fields = {"platform", "experiment_strategy"}
+    for rule_type, schema in schema_json.items():
+        if rule_type != "custom_rules":
+            fields.update(schema)
+    return fields
+
+
+def row_hashes(df, fields):
+    """
+    64-bit hash of the relevant fields of every row. The hash also covers the
+    column names and dtypes, and the value types of mixed object columns, since
+    they change the validation result.
+    """
+    columns = [column for column in df.columns if column in fields]
+    frame = df[columns]
+    value_types = {
+        f"{column}\x00type": frame[column].map(lambda value: type(value).__name__)
+        for column in columns
+        if frame[column].dtype == object and pd.api.types.infer_dtype(frame[column], skipna=False) != "string"
+    }
+    if value_types:
+        frame = pd.concat([frame, pd.DataFrame(value_types, index=frame.index)], axis=1)
+
+    signature = repr([(column, str(dtype)) for column, dtype in frame.dtypes.items()]).encode()
+    salt = np.frombuffer(hashlib.sha256(signature).digest()[:8], dtype=np.uint64)[0]
+    if frame.shape[1] == 0:
+        return np.full(len(frame), salt, dtype=np.uint64)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy() ^ salt
+
+
+def load_state(state_file, schema_key):
+    """
+    Load the row results of a previous run. Results recorded for another schema
+    or package version are discarded.
+    Returns a dict of row hash to row errors (empty dict for valid rows).
+    """
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION or state.get("schema_key") != schema_key:
+        return {}
+    results = {int(row_hash): {} for row_hash in state.get("valid_rows", [])}
+    results.update({int(row_hash): errors for row_hash, errors in state.get("invalid_rows", {}).items()})
+    return results
+
+
+def save_state(state_file, schema_key, results):
+    """
+    Store the row results of this run for the next incremental run.
+    """
+    state = {
+        "version": STATE_VERSION,
+        "schema_key": schema_key,
+        "valid_rows": [row_hash for row_hash, errors in results.items() if not errors],
+        "invalid_rows": {str(row_hash): errors for row_hash, errors in results.items() if errors},
+    }
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(state, f)
+    os.replace(temp_file, state_file)
+
+
+def validate_incremental(df, fields, cached, validate):
+    """
+    Validate only the rows of df whose hash is not in cached, and merge their
+    errors with the cached results of the other rows.
+    validate is called with the DataFrame of new or changed rows and returns
+    (valid, errors) like validate_data.
+    Returns (valid, errors, results, revalidated) where results maps the hash of
+    every row of df to its errors and revalidated is the number of rows validated.
+    """
+    hashes = row_hashes(df, fields)
+    known = np.fromiter((int(row_hash) in cached for row_hash in hashes), dtype=bool, count=len(hashes))
+
+    errors_by_position = {}
+    stale = np.flatnonzero(~known)
+    if len(stale):
+        _, new_errors = validate(df.iloc[stale])
+        row_positions = {df.index[position] + 1: position for position in stale}
+        for error in new_errors:
+            errors_by_position[row_positions[error['row']]] = error['errors']
+
+    results = {}
+    for position, row_hash in enumerate(hashes.tolist()):
+        if known[position]:
+            results[row_hash] = cached[row_hash]
+            if cached[row_hash]:
+                errors_by_position[position] = cached[row_hash]
+        else:
+            results[row_hash] = errors_by_position.get(position, {})
+
+    errors = [
+        {'row': df.index[position] + 1, 'errors': errors_by_position[position]}
+        for position in sorted(errors_by_position)
+    ]
+    return not errors, errors, results, len(stale)
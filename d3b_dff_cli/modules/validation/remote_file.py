@@ -0,0 +1,270 @@
+"""
+Read BAM/CRAM files in object storage with HTTP range requests.
+
+http(s):// URLs are read directly. s3:// URLs are read through the S3 API of
+AWS, or of an S3-compatible endpoint such as MinIO set with AWS_ENDPOINT_URL.
+Requests are signed with AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY when they are
+set, else with the credentials botocore finds when it is installed (profiles,
+~/.aws/credentials, instance and container roles). Objects of public buckets
+can be read unsigned from their https:// URL. Only the byte ranges that are
+read are fetched, and every request goes through one pooled session, so files
+checked from a thread pool share their connections.
+"""
+import datetime
+import hashlib
+import hmac
+import os
+import threading
+from urllib.parse import quote, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+REMOTE_SCHEMES = ("http://", "https://", "s3://")
+
+# Size of the first range fetched from a file; every further range of the
+# same file is twice as large, up to MAX_READAHEAD
+READAHEAD = 64 * 1024
+MAX_READAHEAD = 8 * 1024 * 1024
+
+POOL_SIZE = 16
+TIMEOUT = 60
+
+_session = None
+_session_lock = threading.Lock()
+_bytes_fetched = 0
+_botocore_session = None
+
+NO_CREDENTIALS = (
+    "No AWS credentials found to read s3:// URLs: set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY, "
+    "or install botocore to use AWS profiles, ~/.aws/credentials and instance roles. "
+    "Objects of public buckets can be read from their https:// URL."
+)
+
+
+def is_remote(path):
+    return path.lower().startswith(REMOTE_SCHEMES)
+
+
+def remote_path(url):
+    """
+    Path of a URL, without its query string.
+    """
+    return urlparse(url).path
+
+
+def get_session(pool_size=POOL_SIZE):
+    """
+    The session shared by every range request, created with pool_size
+    connections per host on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def bytes_fetched():
+    """
+    Number of bytes fetched by range requests so far.
+    """
+    return _bytes_fetched
+
+
+def count_fetched(size):
+    global _bytes_fetched
+    with _session_lock:
+        _bytes_fetched += size
+
+
+def get_botocore_session():
+    """
+    The botocore session resolving AWS credentials and region, or None when
+    botocore is not installed.
+    """
+    global _botocore_session
+    with _session_lock:
+        if _botocore_session is None:
+            try:
+                import botocore.session
+            except ImportError:
+                _botocore_session = False
+            else:
+                _botocore_session = botocore.session.get_session()
+        return _botocore_session or None
+
+
+def s3_region():
+    region = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+    if not region and get_botocore_session():
+        region = get_botocore_session().get_config_variable("region")
+    return region or "us-east-1"
+
+
+def aws_credentials():
+    """
+    Access key, secret key and session token signing S3 requests, from the
+    environment, else from botocore. Raises ValueError when there are none.
+    """
+    access_key = os.environ.get("AWS_ACCESS_KEY_ID")
+    secret_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
+    if access_key and secret_key:
+        return access_key, secret_key, os.environ.get("AWS_SESSION_TOKEN")
+    session = get_botocore_session()
+    if not session:
+        raise ValueError(NO_CREDENTIALS)
+    from botocore.exceptions import BotoCoreError
+
+    try:
+        # botocore caches the credentials and refreshes those of roles before they expire
+        credentials = session.get_credentials()
+        frozen = credentials.get_frozen_credentials() if credentials else None
+    except BotoCoreError as e:
+        raise ValueError(f"Could not load AWS credentials to read s3:// URLs: {e}")
+    if frozen is None:
+        raise ValueError(NO_CREDENTIALS)
+    return frozen.access_key, frozen.secret_key, frozen.token
+
+
+def s3_http_url(url):
+    """
+    HTTP URL of an s3://bucket/key URL: path-style on AWS_ENDPOINT_URL when it
+    is set, else virtual-hosted on AWS.
+    """
+    parsed = urlparse(url)
+    key = quote(parsed.path.lstrip("/"), safe="/~")
+    endpoint = os.environ.get("AWS_ENDPOINT_URL_S3") or os.environ.get("AWS_ENDPOINT_URL")
+    if endpoint:
+        return f"{endpoint.rstrip('/')}/{parsed.netloc}/{key}"
+    return f"https://{parsed.netloc}.s3.{s3_region()}.amazonaws.com/{key}"
+
+
+def sign_s3_request(url, headers):
+    """
+    Add the AWS Signature Version 4 headers of a GET request of url to headers.
+    """
+    access_key, secret_key, token = aws_credentials()
+    parsed = urlparse(url)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = now.strftime("%Y%m%d")
+    region = s3_region()
+
+    signed = {
+        "host": parsed.netloc,
+        "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+        "x-amz-date": amz_date,
+    }
+    if token:
+        signed["x-amz-security-token"] = token
+    signed_headers = ";".join(sorted(signed))
+    canonical_request = "\n".join([
+        "GET",
+        parsed.path or "/",
+        "",
+        "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+        signed_headers,
+        "UNSIGNED-PAYLOAD",
+    ])
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    key = ("AWS4" + secret_key).encode()
+    for part in (date, region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    headers.update({name: value for name, value in signed.items() if name != "host"})
+    headers["Authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return headers
+
+
+class RangeFile:
+    """
+    Read-only file over an http(s):// or s3:// URL, fetching the byte ranges
+    that are read. Ranges are read ahead, doubling in size for sequential reads.
+    """
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.s3 = url.lower().startswith("s3://")
+        self.http_url = s3_http_url(url) if self.s3 else url
+        self.session = session or get_session()
+        self.position = 0
+        self.buffer = b""
+        self.buffer_start = 0
+        self.readahead = READAHEAD
+
+    def fetch(self, start, size):
+        """
+        Fetch up to size bytes from start. Returns b"" past the end of the file.
+        """
+        headers = {"Range": f"bytes={start}-{start + size - 1}"}
+        if self.s3:
+            sign_s3_request(self.http_url, headers)
+        with self.session.get(self.http_url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 416:
+                return b""
+            response.raise_for_status()
+            if response.status_code == 206:
+                data = response.content
+            else:
+                # The server ignored the range: stop reading once the range is received
+                data = bytearray()
+                for chunk in response.iter_content(chunk_size=READAHEAD):
+                    data += chunk
+                    if len(data) >= start + size:
+                        break
+                data = bytes(data[start:start + size])
+        count_fetched(len(data))
+        return data
+
+    def read(self, size):
+        offset = self.position - self.buffer_start
+        if not 0 <= offset <= len(self.buffer) or len(self.buffer) - offset < size:
+            if 0 <= offset <= len(self.buffer):
+                # Keep the unread part of the buffer and fetch what follows it
+                kept = self.buffer[offset:]
+            else:
+                kept = b""
+            missing = max(size - len(kept), self.readahead)
+            self.buffer = kept + self.fetch(self.position + len(kept), missing)
+            self.buffer_start = self.position
+            self.readahead = min(self.readahead * 2, MAX_READAHEAD)
+            offset = 0
+        data = self.buffer[offset:offset + size]
+        self.position += len(data)
+        return data
+
+    def seek(self, position):
+        self.position = position
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        self.buffer = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_file(path):
+    """
+    Open a local file, or a remote file from its http(s):// or s3:// URL, for reading bytes.
+    """
+    if is_remote(path):
+        return RangeFile(path)
+    return open(path, "rb")
@@ -0,0 +1,274 @@
+"""
+Machine-readable manifest validation reports.
+
+Row errors are aggregated while validating: identical (field, message) errors
+are merged into one entry with a count, the ranges of rows they occur in and a
+few example rows. Only the aggregates are kept in memory; per-row errors can be
+streamed to an NDJSON file as they are found. Rows usually come in order; rows
+that cross-row checks hold back until their mate is found come after later rows,
+and are merged into the row ranges where they belong.
+"""
+import bisect
+import json
+import os
+
+REPORT_FORMATS = ["json", "ndjson", "parquet"]
+
+
+def report_format(report_file, requested=None):
+    """
+    Get the report format from the requested one or from the report file extension.
+    """
+    if requested:
+        return requested
+    extension = os.path.splitext(report_file)[1].lstrip(".").lower()
+    if extension in REPORT_FORMATS:
+        return extension
+    if extension == "jsonl":
+        return "ndjson"
+    raise ValueError(f"Can't infer report format from {report_file}, use one of {', '.join(REPORT_FORMATS)}.")
+
+
+class ValidationReport:
+    """
+    Aggregate row errors into one entry per distinct (field, message).
+    """
+
+    def __init__(self, ndjson_file=None, max_examples=5, max_ranges=100):
+        self.max_examples = max_examples
+        self.max_ranges = max_ranges
+        self.entries = {}
+        self.rows_with_errors = 0
+        self.warnings_only = True
+        self.stopped_at = None
+        self.ndjson = open(ndjson_file, "w") if ndjson_file else None
+
+    @property
+    def valid(self):
+        return self.rows_with_errors == 0
+
+    def add(self, errors):
+        """
+        Add the row errors of a validated chunk, as returned by validate_data.
+        """
+        for error in errors:
+            row = int(error['row'])
+            self.rows_with_errors += 1
+            if self.ndjson:
+                record = {"row": row, "errors": error['errors']}
+                if error.get('related'):
+                    record["related"] = error['related']
+                self.ndjson.write(json.dumps(record) + "\n")
+            for field, field_errors in error['errors'].items():
+                for field_error in field_errors:
+                    self._add_error(field, field_error, row)
+
+    def _add_error(self, field, message, row):
+        entry = self.entries.get((field, message))
+        if entry is None:
+            severity = "warning" if "Warning" in message else "error"
+            if severity == "error":
+                self.warnings_only = False
+            entry = {
+                "field": field,
+                "message": message,
+                "severity": severity,
+                "count": 0,
+                "row_ranges": [],
+                "ranges_truncated": False,
+                "example_rows": [],
+            }
+            self.entries[(field, message)] = entry
+
+        entry["count"] += 1
+        examples = entry["example_rows"]
+        if len(examples) < self.max_examples:
+            bisect.insort(examples, row)
+        elif row < examples[-1]:
+            # Rows held back by cross-row checks come after later rows: keep the first ones
+            bisect.insort(examples, row)
+            examples.pop()
+        ranges = entry["row_ranges"]
+        if ranges and ranges[-1][1] + 1 == row:
+            ranges[-1][1] = row
+        elif not ranges or row > ranges[-1][1]:
+            if len(ranges) < 2 * self.max_ranges:
+                ranges.append([row, row])
+            else:
+                entry["ranges_truncated"] = True
+        else:
+            self._insert_row(entry, row)
+
+    def _insert_row(self, entry, row):
+        """
+        Add a row that comes before the last range, merging it with its neighbours.
+        Up to twice max_ranges ranges are kept so that late rows can still join
+        the ranges that are reported; beyond that the last one is dropped.
+        """
+        ranges = entry["row_ranges"]
+        position = bisect.bisect_right(ranges, [row, float("inf")])
+        previous = ranges[position - 1] if position else None
+        following = ranges[position] if position < len(ranges) else None
+        if previous and previous[1] >= row:
+            return
+        if previous and previous[1] + 1 == row:
+            previous[1] = row
+            if following and following[0] == row + 1:
+                previous[1] = following[1]
+                del ranges[position]
+        elif following and following[0] == row + 1:
+            following[0] = row
+        else:
+            ranges.insert(position, [row, row])
+            if len(ranges) > 2 * self.max_ranges:
+                ranges.pop()
+                entry["ranges_truncated"] = True
+
+    def _trim_ranges(self, entry):
+        ranges = entry["row_ranges"]
+        if len(ranges) <= self.max_ranges:
+            return entry
+        return dict(entry, row_ranges=ranges[:self.max_ranges], ranges_truncated=True)
+
+    def status(self):
+        if self.valid:
+            return "passed"
+        return "warnings" if self.warnings_only else "failed"
+
+    def summary(self):
+        """
+        Summary of the validation with the aggregated errors, most frequent first.
+        """
+        errors = sorted(
+            (self._trim_ranges(entry) for entry in self.entries.values()),
+            key=lambda entry: (-entry["count"], entry["field"], entry["message"]),
+        )
+        return {
+            "status": self.status(),
+            "valid": self.valid,
+            "rows_with_errors": self.rows_with_errors,
+            "error_count": sum(entry["count"] for entry in errors),
+            "distinct_errors": len(errors),
+            "stopped_at_row": self.stopped_at,
+            "errors": errors,
+        }
+
+    def close(self, report_file=None, fmt=None):
+        """
+        Finish the NDJSON stream with the summary, or write the summary as JSON or Parquet.
+        """
+        summary = self.summary()
+        if self.ndjson:
+            self.ndjson.write(json.dumps({"summary": summary}) + "\n")
+            self.ndjson.close()
+            self.ndjson = None
+        if report_file and fmt == "json":
+            with open(report_file, "w") as f:
+                json.dump(summary, f, indent=2)
+        elif report_file and fmt == "parquet":
+            write_parquet_summary(summary, report_file)
+        return summary
+
+
+def write_parquet_summary(summary, report_file):
+    """
+    Write the aggregated errors as a Parquet table, one row per distinct error.
+    """
+    import pandas as pd
+
+    columns = ["field", "message", "severity", "count", "row_ranges", "ranges_truncated", "example_rows"]
+    table = pd.DataFrame(summary["errors"], columns=columns)
+    table["row_ranges"] = table["row_ranges"].map(
+        lambda ranges: ",".join(f"{start}-{end}" if start != end else str(start) for start, end in ranges)
+    )
+    table["status"] = summary["status"]
+    try:
+        table.to_parquet(report_file, index=False)
+    except ImportError:
+        raise ValueError("Parquet reports require pyarrow. Install it or use a json/ndjson report.")
+
+
+def has_errors(error):
+    """
+    Whether the errors of a row include more than warnings.
+    """
+    return any("Warning" not in message for messages in error['errors'].values() for message in messages)
+
+
+class RowError:
+    """
+    Errors of one manifest row: its row number, the messages of every field and,
+    for cross-row errors, the row each field relates to, such as {"row": 3}.
+    """
+
+    __slots__ = ("row", "errors", "related")
+
+    def __init__(self, row, errors, related=None):
+        self.row = row
+        self.errors = errors
+        self.related = related or {}
+
+    @property
+    def warnings_only(self):
+        return all("Warning" in message for messages in self.errors.values() for message in messages)
+
+    def to_dict(self):
+        if self.related:
+            return {"row": self.row, "errors": self.errors, "related": self.related}
+        return {"row": self.row, "errors": self.errors}
+
+    def __repr__(self):
+        return f"RowError(row={self.row}, errors={self.errors!r})"
+
+
+class ValidationResult:
+    """
+    Result of the validation of one manifest:
+        - status: "passed", "warnings" or "failed"
+        - rows: number of rows validated
+        - row_errors: RowError of every row with errors or warnings, in row
+          order, or None when they were only reported as they were found
+        - summary: aggregated errors, as written to JSON reports
+        - timings: seconds spent loading the manifest, validating it and in total
+        - revalidated: rows validated again with an incremental state file, else None
+    """
+
+    def __init__(self, summary, rows, row_errors=None, timings=None, revalidated=None):
+        self.summary = summary
+        self.rows = rows
+        self.row_errors = row_errors
+        self.timings = timings or {}
+        self.revalidated = revalidated
+
+    @property
+    def status(self):
+        return self.summary["status"]
+
+    @property
+    def valid(self):
+        return self.summary["valid"]
+
+    @property
+    def rows_with_errors(self):
+        return self.summary["rows_with_errors"]
+
+    @property
+    def error_count(self):
+        return self.summary["error_count"]
+
+    @property
+    def stopped_at_row(self):
+        return self.summary["stopped_at_row"]
+
+    def to_dict(self):
+        return {
+            "status": self.status,
+            "rows": self.rows,
+            "row_errors": [error.to_dict() for error in self.row_errors] if self.row_errors is not None else None,
+            "summary": self.summary,
+            "timings": self.timings,
+            "revalidated": self.revalidated,
+        }
+
+    def __repr__(self):
+        return f"ValidationResult(status={self.status!r}, rows={self.rows}, rows_with_errors={self.rows_with_errors})"
@@ -0,0 +1,221 @@
+"""
+Compiled evaluator for condition/consequence manifest rules, as in
+data/validation_rules.json.
+
+Every rule holds a list of conditions and a list of consequences. A consequence
+is checked on the rows where all conditions hold, and a row passes it when its
+predicate matches the consequence's "valid" value. Predicates are "equals"
+(comma-separated values), "ends_with" (comma-separated suffixes) and "empty";
+file_size consequences with byte cutoffs check the minimum file size.
+
+Rules are compiled once into predicate keys. While evaluating a manifest, each
+column is factorized once, predicates are computed on its distinct values and
+broadcast to the rows, and every predicate or condition mask is computed only
+once, however many rules use it.
+"""
+import json
+import numpy as np
+import pandas as pd
+from .custom_checks import WGS_WXS_STRATEGIES
+
+DEFAULT_RULE_SET = "transfer_validation_rules"
+
+
+def load_rules(rules_file, rule_set=DEFAULT_RULE_SET):
+    """
+    Load a list of rules from a rules file.
+    """
+    with open(rules_file, "r") as f:
+        rules = json.load(f)
+    if rule_set not in rules:
+        raise ValueError(f"Rule set '{rule_set}' not found in {rules_file}, use one of {', '.join(rules)}.")
+    return rules[rule_set]
+
+
+def _split_values(values):
+    """
+    Lowercase values of a comma-separated rule list, like the manifest values.
+    """
+    return tuple(value.strip().casefold() for value in str(values).split(",") if value.strip())
+
+
+def compile_predicate(spec):
+    """
+    Compile a condition or consequence into a hashable predicate key.
+    """
+    column = spec["column"]
+    if "equals" in spec:
+        return ("equals", column, frozenset(_split_values(spec["equals"])))
+    if "ends_with" in spec:
+        return ("ends_with", column, _split_values(spec["ends_with"]))
+    if "empty" in spec:
+        # "empty": false is the same predicate, with the opposite outcome
+        return ("empty", column, None)
+    raise ValueError(f"Unsupported rule for column {column}: {spec}")
+
+
+def describe_predicate(key):
+    """
+    Human-readable description of a condition predicate.
+    """
+    kind, column, values = key
+    if kind == "equals":
+        values = sorted(values)
+        return f"{column} is {values[0]}" if len(values) == 1 else f"{column} is one of {', '.join(values)}"
+    if kind == "ends_with":
+        return f"{column} ends with {' or '.join(values)}"
+    return f"{column} is empty"
+
+
+def compile_consequence(spec, when):
+    """
+    Compile a consequence into (kind, column, key, expected, message).
+    """
+    column = spec["column"]
+    if "general_byte_cutoff" in spec or "wgs_wxs_byte_cutoff" in spec:
+        cutoffs = (int(spec.get("general_byte_cutoff", 0)), int(spec.get("wgs_wxs_byte_cutoff", 0)))
+        return ("cutoff", column, cutoffs, True, None)
+
+    key = compile_predicate(spec)
+    expected = bool(spec.get("valid", True))
+    if key[0] == "empty" and spec["empty"] is False:
+        expected = not expected
+    kind, _, values = key
+    if kind == "empty":
+        message = "must be empty" if expected else "must not be empty"
+    elif kind == "ends_with":
+        message = f"must {'' if expected else 'not '}end with {' or '.join(values)}"
+    else:
+        # Filled with the value of each row
+        message = "unallowed value {}" if expected else "value {} is not allowed"
+    return (kind, column, key, expected, message + when)
+
+
+def compile_rules(rules):
+    """
+    Compile a list of rules into (condition keys, consequences) pairs.
+    """
+    compiled = []
+    for rule in rules:
+        conditions = tuple(compile_predicate(condition) for condition in rule.get("conditions", []))
+        when = f" when {' and '.join(describe_predicate(key) for key in conditions)}" if conditions else ""
+        consequences = [compile_consequence(spec, when) for spec in rule.get("consequences", [])]
+        compiled.append((conditions, consequences))
+    return compiled
+
+
+class RuleContext:
+    """
+    Masks of the predicates evaluated on one manifest DataFrame, computed once each.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = {}
+        self.empty = {}
+        self.strings = {}
+        self.masks = {}
+
+    def column(self, column):
+        """
+        Factorized values of a column: (codes, distinct values).
+        """
+        if column not in self.columns:
+            if column in self.df.columns:
+                codes, uniques = pd.factorize(self.df[column].to_numpy(dtype=object), use_na_sentinel=False)
+                self.columns[column] = (codes, pd.Index(uniques, dtype=object))
+            else:
+                # Missing column: every row is empty
+                self.columns[column] = (np.zeros(len(self.df), dtype=np.intp), pd.Index([None], dtype=object))
+        return self.columns[column]
+
+    def unique_mask(self, key):
+        """
+        Predicate evaluated on the distinct values of its column. Only equals and
+        ends_with need the values as case-folded strings.
+        """
+        kind, column, values = key
+        uniques = self.column(column)[1]
+        if column not in self.empty:
+            # Missing values are read as NaN, or as "nan" once converted to strings by load_data
+            self.empty[column] = np.asarray(uniques.isna() | uniques.isin(["", "nan"]), dtype=bool)
+        empty = self.empty[column]
+        if kind == "empty":
+            return empty
+        if column not in self.strings:
+            self.strings[column] = uniques.astype(str).str.strip().str.casefold()
+        strings = self.strings[column]
+        if kind == "equals":
+            return np.asarray(strings.isin(values), dtype=bool) & ~empty
+        return np.asarray(strings.str.endswith(values), dtype=bool) & ~empty
+
+    def mask(self, key):
+        """
+        Row mask of a predicate.
+        """
+        if key not in self.masks:
+            codes = self.column(key[1])[0]
+            self.masks[key] = self.unique_mask(key)[codes]
+        return self.masks[key]
+
+    def conditions(self, keys):
+        """
+        Row mask of a conjunction of predicates.
+        """
+        if keys not in self.masks:
+            mask = np.ones(len(self.df), dtype=bool)
+            for key in keys:
+                mask = mask & self.mask(key)
+            self.masks[keys] = mask
+        return self.masks[keys]
+
+
+def _check_cutoff(context, column, cutoffs, rows):
+    """
+    Rows whose file size is below the cutoff of their experiment, with their messages.
+    """
+    general_cutoff, wgs_wxs_cutoff = cutoffs
+    codes, uniques = context.column(column)
+    sizes = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype=float)[codes]
+    wgs_wxs = context.mask(("equals", "experiment_strategy", frozenset(WGS_WXS_STRATEGIES)))
+    cutoff = np.where(wgs_wxs, wgs_wxs_cutoff, general_cutoff)
+    positions = np.flatnonzero(rows & (sizes < cutoff))
+    formats = context.column("file_format")
+    messages = [
+        f"[Warning] must be at least {cutoff[position]} for file_format '{formats[1][formats[0][position]]}'."
+        for position in positions
+    ]
+    return positions, messages
+
+
+def evaluate_rules(df, compiled):
+    """
+    Evaluate compiled rules over a manifest DataFrame in one pass.
+    Returns (valid, errors) like validate_data.
+    """
+    context = RuleContext(df)
+    row_errors = {}
+    for conditions, consequences in compiled:
+        rows = context.conditions(conditions)
+        if not rows.any():
+            continue
+        for kind, column, key, expected, message in consequences:
+            if kind == "cutoff":
+                positions, messages = _check_cutoff(context, column, key, rows)
+            else:
+                positions = np.flatnonzero(rows & (context.mask(key) != expected))
+                if "{}" in message:
+                    codes, uniques = context.column(column)
+                    messages = [message.format(uniques[codes[position]]) for position in positions]
+                else:
+                    messages = [message] * len(positions)
+            for position, row_message in zip(positions.tolist(), messages):
+                field_errors = row_errors.setdefault(position, {}).setdefault(column, [])
+                if row_message not in field_errors:
+                    field_errors.append(row_message)
+
+    errors = [
+        {'row': df.index[position] + 1, 'errors': dict(sorted(row_errors[position].items()))}
+        for position in sorted(row_errors)
+    ]
+    return not errors, errors
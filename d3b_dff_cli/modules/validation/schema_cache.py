@@ -0,0 +1,78 @@
+"""
+On-disk cache of the prepared (loaded and compiled) validation schema.
+
+Entries are keyed by a content hash of the schema file and the package
+version, so editing the schema or upgrading the package invalidates them.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from ...version import __version__
+
+# Bump when the structure of the prepared schema changes
+CACHE_VERSION = 3
+
+
+def cache_dir():
+    """
+    Directory of the schema cache: $D3B_DFF_CACHE_DIR, else $XDG_CACHE_HOME/d3b-dff-cli,
+    else ~/.cache/d3b-dff-cli.
+    """
+    if os.environ.get("D3B_DFF_CACHE_DIR"):
+        return os.environ["D3B_DFF_CACHE_DIR"]
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "d3b-dff-cli")
+
+
+def schema_cache_key(schema_file):
+    """
+    Hash of the schema file contents, the package version and the cache format.
+    """
+    digest = hashlib.sha256(f"{__version__}:{CACHE_VERSION}".encode())
+    with open(schema_file, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def schema_json_key(schema_json):
+    """
+    Hash of a loaded schema, as canonical JSON, the package version and the cache format.
+    """
+    digest = hashlib.sha256(f"{__version__}:{CACHE_VERSION}".encode())
+    digest.update(json.dumps(schema_json, sort_keys=True, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+
+def load_cached(schema_file, build):
+    """
+    Return build(schema_file), read from the cache when an entry for the current
+    schema contents and package version exists. On a miss, the result is stored
+    and stale entries for the same schema file are removed. Cache errors are
+    ignored and fall back to calling build.
+    """
+    prefix = os.path.splitext(os.path.basename(schema_file))[0] + "-"
+    path = os.path.join(cache_dir(), f"{prefix}{schema_cache_key(schema_file)[:32]}.pickle")
+
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+        pass
+
+    prepared = build(schema_file)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a partial entry
+        with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            pickle.dump(prepared, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith(".pickle") and name != os.path.basename(path):
+                os.remove(os.path.join(directory, name))
+    except OSError:
+        pass
+    return prepared
@@ -18,6 +18,10 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={
+        # Parquet and Feather manifests, and the Arrow CSV reader
+        'arrow': ['pyarrow>=14'],
+    },
     python_requires='>=3.8',
     author='Xiaoyan Huang',
     author_email='huangx@chop.edu',
@@ -0,0 +1,51 @@
+import csv
+
+import pytest
+
+from d3b_dff_cli.modules.validation.check_manifest import validate
+
+
+@pytest.fixture
+def paired_manifest(tmp_path):
+    """
+    R1 files first, then their R2 mates, with every row missing required
+    fields; R1 rows are held by the cross-row checks until their mate is read.
+    """
+    rows = []
+    for mate in ("R1", "R2"):
+        for i in range(60):
+            rows.append({
+                "file_name": f"lib{i}_{mate}_001.fastq.gz",
+                "file_format": "FASTQ",
+                "is_paired_end": "TRUE",
+                "read_pair_number": mate,
+                "sample_id": "S",
+                "experiment_strategy": "WGS",
+                "platform": "Illumina",
+            })
+    path = tmp_path / "manifest.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [None, 50])
+@pytest.mark.parametrize("limit", [{"max_errors": 3}, {"max_errors": 70}, {"fail_fast": True}])
+def test_cross_row_with_error_limit(paired_manifest, chunksize, limit):
+    options = {"cross_row": True, "chunksize": chunksize, **limit}
+    result = validate(paired_manifest, options=options)
+    rows = [error.row for error in result.row_errors]
+    assert rows
+    assert rows == list(range(1, len(rows) + 1))
+    assert result.stopped_at_row == rows[-1]
+    assert len(rows) >= limit.get("max_errors", 1)
+
+
+def test_cross_row_ranges_in_row_order(paired_manifest):
+    result = validate(paired_manifest, options={"cross_row": True, "chunksize": 50})
+    for entry in result.summary["errors"]:
+        ranges = entry["row_ranges"]
+        assert ranges == sorted(ranges)
+        assert all(ranges[i][1] + 1 < ranges[i + 1][0] for i in range(len(ranges) - 1))